@@ -0,0 +1,139 @@
+"""Build step for the apps' images.
+
+Run ``python moneyball_asset_build.py`` after adding or changing an image.
+It hashes every image in the repo, stores each distinct one once under
+``assets/`` (the same content-addressed layout as ``store_asset``) and
+writes resized and re-encoded variants next to it:
+
+- ``<hash>-<width>.<format>`` thumbnails for the widths the apps pass to
+  ``st.image`` (logos are 1024 px files shown at 150-300 px);
+- ``<hash>-full.<format>`` full-size AVIF/WebP copies for backgrounds.
+
+``assets/manifest.json`` maps every source file name to its hash and lists
+the variants with their pixel width and byte size; files Pillow cannot
+decode (e.g. a placeholder saved as ``.png``) are reported and left out;
+``moneyball_assets.image_variant`` reads it at runtime to pick the smallest
+variant that is at least as wide as requested. Apps keep working from the
+original files when the manifest has not been built.
+
+Needs Pillow (AVIF needs Pillow >= 11.2 or pillow-avif-plugin; it is
+skipped when unavailable). ``st.image`` decodes with the app's own
+Pillow, so ``image_variant`` only hands it AVIF when that Pillow can.
+"""
+import glob
+import json
+import os
+import re
+
+from PIL import Image, UnidentifiedImageError
+
+from moneyball_assets import ASSET_DIR, MANIFEST_PATH, file_digest, store_asset
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+IMAGE_PATTERNS = ("*.png", "*.jpg", "*.jpeg")
+THUMBNAIL_WIDTHS = (160, 180, 300)
+FORMATS = {"avif": {"quality": 60}, "webp": {"quality": 82, "method": 6}}
+
+
+def _sources(root=_HERE):
+    paths = set()
+    for pattern in IMAGE_PATTERNS:
+        paths.update(glob.glob(os.path.join(root, pattern)))
+    # Originals already in the store; variants carry a "-<size>" suffix.
+    paths.update(p for p in glob.glob(os.path.join(ASSET_DIR, "*"))
+                 if re.fullmatch(r"[0-9a-f]{16}\.\w+", os.path.basename(p)))
+    return sorted(paths)
+
+
+def _save(image, path, fmt):
+    if os.path.exists(path):
+        return True
+    try:
+        image.save(path + ".tmp", format=fmt.upper(), **FORMATS[fmt])
+    except (KeyError, OSError, ValueError):
+        # No encoder for this format in the installed Pillow.
+        if os.path.exists(path + ".tmp"):
+            os.remove(path + ".tmp")
+        return False
+    os.replace(path + ".tmp", path)
+    return True
+
+
+def _variants(source, digest, widths):
+    variants = []
+    with Image.open(source) as image:
+        image.load()
+        full_width, height = image.size
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        sizes = [(w, round(height * w / full_width)) for w in widths if w < full_width]
+        for label, size in [("full", image.size)] + [(str(size[0]), size) for size in sizes]:
+            resized = image if size == image.size else image.resize(size, Image.LANCZOS)
+            for fmt in FORMATS:
+                path = os.path.join(ASSET_DIR, f"{digest}-{label}.{fmt}")
+                if _save(resized, path, fmt):
+                    variants.append({
+                        "path": os.path.relpath(path, _HERE),
+                        "width": size[0],
+                        "format": fmt,
+                        "bytes": os.path.getsize(path),
+                    })
+    return full_width, height, variants
+
+
+def build(sources=None, widths=THUMBNAIL_WIDTHS):
+    """Dedupe ``sources`` by content hash, write variants and the manifest."""
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    names = {}
+    assets = {}
+    skipped = {}
+    for source in sources if sources is not None else _sources():
+        name = os.path.relpath(source, _HERE)
+        digest = file_digest(source)[:16]
+        if digest in skipped.values():
+            skipped[name] = digest
+            continue
+        if digest not in assets:
+            try:
+                width, height, variants = _variants(source, digest, widths)
+            except (UnidentifiedImageError, OSError) as e:
+                print(f"skipping {name}: {e}")
+                skipped[name] = digest
+                continue
+            with open(source, "rb") as f:
+                original = store_asset(f.read(), os.path.splitext(source)[1])
+            assets[digest] = {
+                "original": os.path.relpath(original, _HERE),
+                "width": width,
+                "height": height,
+                "bytes": os.path.getsize(original),
+                "variants": variants,
+            }
+        names[name] = digest
+    manifest = {"sources": names, "assets": assets, "skipped": sorted(skipped)}
+    with open(MANIFEST_PATH + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(MANIFEST_PATH + ".tmp", MANIFEST_PATH)
+    return manifest
+
+
+if __name__ == "__main__":
+    import time
+
+    from moneyball_assets import image_variant
+
+    start = time.perf_counter()
+    manifest = build()
+    elapsed = time.perf_counter() - start
+    source_bytes = sum(os.path.getsize(os.path.join(_HERE, s)) for s in manifest["sources"])
+    unique_bytes = sum(a["bytes"] for a in manifest["assets"].values())
+    print(f"{len(manifest['sources'])} images, {len(manifest['assets'])} distinct, "
+          f"{source_bytes / 1e6:.1f} MB -> {unique_bytes / 1e6:.1f} MB after dedupe ({elapsed:.1f} s); "
+          f"{len(manifest['skipped'])} not decodable")
+
+    # First paint of a typical app: the logo at 160 px and the background.
+    for name, width in (("moneyball_logo.png", 160), ("moneyball_logo.png", 180), ("background.png", None)):
+        chosen = image_variant(name, width)
+        before, after = os.path.getsize(name), os.path.getsize(chosen)
+        print(f"{name} @ {width or 'full'}: {before / 1e3:.0f} kB -> {os.path.relpath(chosen, _HERE)} "
+              f"{after / 1e3:.1f} kB ({1 - after / before:.1%} smaller)")
@@ -0,0 +1,261 @@
+"""Background images for the Streamlit apps.
+
+``set_background`` used to open the PNG, base64-encode it and inject the
+result on every rerun, so every widget interaction re-read and re-encoded
+2.6 MB and sent 3.5 MB of CSS to the browser. Here each image is encoded
+once per process: files are identified by content hash (re-hashed only
+when their mtime or size changes) and the CSS is kept in a process-wide
+cache, so identical images under different names share one entry.
+
+When Streamlit static serving is on (``server.enableStaticServing = true``
+in ``.streamlit/config.toml``) the image is instead copied once to
+``static/`` under its content hash and the CSS only references its URL,
+so each rerun sends a few hundred bytes. A ``url`` can also be given
+directly for images hosted elsewhere.
+
+Images that used to be pasted into the scripts as base64 literals are
+referenced by their file names instead, so the scripts stay small and an
+image is only read when a background is actually set. ``image_variant``
+swaps in the resized/re-encoded copies listed in the manifest that
+``moneyball_asset_build`` writes to ``assets/`` under their content hash
+(``store_asset``).
+"""
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = os.path.join(_HERE, "assets")
+MANIFEST_PATH = os.path.join(ASSET_DIR, "manifest.json")
+STATIC_DIR = os.path.join(_HERE, "static")
+STATIC_URL = "app/static"
+# Streamlit's static handler sends other extensions (AVIF among them) as
+# text/plain with nosniff, so the browser would drop the image.
+STATIC_FORMATS = ("webp",)
+
+_BACKGROUND_CSS = """
+    <style>
+    .stApp {{
+        background-image: url("{url}");
+        background-size: cover;
+        background-repeat: no-repeat;
+        background-attachment: fixed;
+        background-position: center;
+    }}
+    </style>
+    """
+
+# Darkening layer drawn between the background and the app content.
+_OVERLAY_CSS = """
+    <style>
+    .stApp {{
+        position: relative;
+    }}
+
+    .stApp::before {{
+        content: "";
+        background-color: {color};
+        position: fixed;
+        top: 0;
+        left: 0;
+        width: 100%;
+        height: 100%;
+        z-index: 0;
+    }}
+
+    section.main > div {{
+        position: relative;
+        z-index: 1;
+    }}
+    </style>
+    """
+
+_digests = {}  # (path, mtime_ns, size) -> sha256 hex digest
+_inline = {}  # (digest, mime type, overlay) -> inline background CSS
+_manifest = {}  # manifest mtime_ns -> parsed manifest
+_decodable = {}  # variant format -> whether the installed Pillow opens it
+
+
+def file_digest(path):
+    """Content hash of ``path``, recomputed only when its mtime or size changes."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    digest = _digests.get(key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        _digests[key] = digest
+    return digest
+
+
+def _overlay_css(color):
+    return "" if color is None else _OVERLAY_CSS.format(color=color)
+
+
+def _content_name(digest, suffix):
+    return f"{digest[:16]}{suffix.lower() or '.png'}"
+
+
+def store_asset(data, suffix=".png", asset_dir=ASSET_DIR):
+    """Write ``data`` to ``asset_dir`` under its content hash and return the path."""
+    path = os.path.join(asset_dir, _content_name(hashlib.sha256(data).hexdigest(), suffix))
+    if not os.path.exists(path):
+        os.makedirs(asset_dir, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def asset_path(name):
+    """Path of a built asset, e.g. ``asset_path("5a124552a3ea9ffc-full.webp")``."""
+    return os.path.join(ASSET_DIR, name)
+
+
+def load_manifest():
+    """The variant manifest written by moneyball_asset_build, or {} if not built."""
+    try:
+        mtime = os.stat(MANIFEST_PATH).st_mtime_ns
+    except OSError:
+        return {}
+    if mtime not in _manifest:
+        with open(MANIFEST_PATH) as f:
+            _manifest.clear()
+            _manifest[mtime] = json.load(f)
+    return _manifest[mtime]
+
+
+def pillow_decodes(fmt):
+    """Whether the installed Pillow can open ``fmt`` (e.g. "avif") files."""
+    if fmt not in _decodable:
+        try:
+            from PIL import Image, features
+        except ImportError:
+            _decodable[fmt] = False
+            return False
+        if fmt == "avif":
+            try:
+                import pillow_avif  # noqa: F401  (registers AVIF on Pillow < 11.2)
+            except ImportError:
+                pass
+        if fmt in features.modules:
+            _decodable[fmt] = features.check_module(fmt)
+        else:
+            _decodable[fmt] = f".{fmt}" in Image.registered_extensions()
+    return _decodable[fmt]
+
+
+def image_variant(path, width=None, formats=None):
+    """Smallest built variant of ``path`` at least ``width`` px wide.
+
+    ``width=None`` asks for full size (backgrounds, decoded by the browser).
+    A width means ``st.image``, which decodes the file with Pillow, so only
+    formats the installed Pillow can open are picked. ``formats`` limits
+    the variants further (e.g. ``STATIC_FORMATS``). Falls back to ``path``
+    when the manifest is missing or has nothing smaller.
+    """
+    entry = load_manifest().get("assets", {}).get(file_digest(path)[:16])
+    if not entry:
+        return path
+    best, best_bytes = path, os.path.getsize(path)
+    for variant in entry["variants"]:
+        adequate = variant["width"] >= width if width else variant["width"] == entry["width"]
+        if formats is not None and variant["format"] not in formats:
+            continue
+        if adequate and width and not pillow_decodes(variant["format"]):
+            continue
+        if adequate and variant["bytes"] < best_bytes:
+            best, best_bytes = os.path.join(_HERE, variant["path"]), variant["bytes"]
+    return best
+
+
+def _mime_type(path):
+    return mimetypes.guess_type(path)[0] or "image/png"
+
+
+def _inline_css(path, overlay):
+    key = (file_digest(path), _mime_type(path), overlay)
+    css = _inline.get(key)
+    if css is None:
+        with open(path, "rb") as f:
+            encoded = base64.b64encode(f.read()).decode()
+        css = _BACKGROUND_CSS.format(url=f"data:{key[1]};base64,{encoded}")
+        css = _inline[key] = css + _overlay_css(overlay)
+    return css
+
+
+def static_url(path, static_dir=STATIC_DIR):
+    """Copy ``path`` into the static folder under its content hash and return its URL."""
+    digest = file_digest(path)
+    name = _content_name(digest, os.path.splitext(path)[1])
+    target = os.path.join(static_dir, name)
+    if not os.path.exists(target):
+        os.makedirs(static_dir, exist_ok=True)
+        shutil.copyfile(path, target + ".tmp")
+        os.replace(target + ".tmp", target)
+    return f"{STATIC_URL}/{name}"
+
+
+def background_css(image_file=None, url=None, static=False, overlay=None):
+    """CSS that sets the app background to ``image_file`` (or ``url``).
+
+    ``overlay`` is an optional CSS colour (e.g. ``"rgba(0, 0, 0, 0.5)"``)
+    laid over the image to keep text readable.
+    """
+    if url is None:
+        if image_file is None:
+            raise ValueError("need an image_file or a url")
+        if static:
+            url = static_url(image_file)
+    if url is None:
+        return _inline_css(image_file, overlay)
+    return _BACKGROUND_CSS.format(url=url) + _overlay_css(overlay)
+
+
+def set_background(image_file=None, url=None, static=None, overlay=None):
+    """Drop-in replacement for the apps' ``set_background``.
+
+    ``static`` defaults to whether Streamlit static serving is enabled.
+    The smallest full-size variant from the asset manifest is used when
+    one has been built (WebP only when served statically).
+    """
+    import streamlit as st
+
+    if static is None:
+        static = bool(st.get_option("server.enableStaticServing"))
+    if image_file is not None:
+        image_file = image_variant(image_file, formats=STATIC_FORMATS if static else None)
+    st.markdown(background_css(image_file, url, static, overlay), unsafe_allow_html=True)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    image = "background.png"
+
+    def per_rerun():
+        with open(image, "rb") as f:
+            data = base64.b64encode(f.read()).decode()
+        return _BACKGROUND_CSS.format(url=f"data:image/png;base64,{data}")
+
+    runs = 50
+    start = time.perf_counter()
+    for _ in range(runs):
+        css = per_rerun()
+    uncached = (time.perf_counter() - start) / runs
+    background_css(image)
+    start = time.perf_counter()
+    for _ in range(runs):
+        cached = background_css(image)
+    cached_s = (time.perf_counter() - start) / runs
+    assert cached == css
+    with tempfile.TemporaryDirectory() as tmp:
+        static_css = background_css(url=static_url(image, tmp))
+    print(f"encode per rerun: {uncached * 1000:.2f} ms, {len(css) / 1e6:.1f} MB of CSS")
+    print(f"cached:           {cached_s * 1000:.3f} ms, {len(cached) / 1e6:.1f} MB of CSS")
+    print(f"static URL:       {len(static_css)} bytes of CSS")
@@ -0,0 +1,177 @@
+"""Score slates from the command line, e.g. from cron.
+
+    python moneyball_batch_score.py slate.csv -o board.parquet
+    zcat backfill.jsonl.gz | python moneyball_batch_score.py - --input-format jsonl > board.csv
+
+Rows are read in fixed-size chunks (CSV or JSON Lines, from a file or
+stdin), validated with the same rules as the bulk slate import, scored
+with ``score_slate`` and appended to the output (CSV, JSON Lines or
+Parquet) before the next chunk is read, so memory stays bounded by
+``--chunk-size`` however long the input is.
+
+The input needs the slate import columns (see ``moneyball_lineup_import``);
+every input column is passed through and the board columns
+``weighted_avg``, ``expected_ab``, ``prob``, ``implied``, ``ev`` and
+``zone`` are appended (probabilities 0-1, EV in percentage points).
+With ``--team-stats`` (a table from ``moneyball_team_stats``) the input
+only needs names, slots and odds: missing stat columns are filled per
+player from the table.
+"""
+import argparse
+import sys
+
+import pandas as pd
+
+from moneyball_lineup_import import validate_slate
+from moneyball_scoring import score_slate
+from moneyball_team_stats import fill_slate
+
+FORMATS = ("csv", "jsonl", "parquet")
+INPUT_FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 100_000
+BOARD_COLUMNS = ["weighted_avg", "expected_ab", "prob", "implied", "ev", "zone"]
+
+
+def _format(path, given, allowed):
+    if given:
+        return given
+    for fmt, suffixes in (("jsonl", (".jsonl", ".ndjson", ".jsonl.gz")), ("parquet", (".parquet",))):
+        if str(path).lower().endswith(suffixes):
+            if fmt not in allowed:
+                raise ValueError(f"{fmt} is not supported here; use one of {', '.join(allowed)}")
+            return fmt
+    return "csv"
+
+
+def read_chunks(source, fmt="csv", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield DataFrames of at most ``chunk_size`` rows from a path or file object."""
+    if fmt == "csv":
+        reader = pd.read_csv(source, chunksize=chunk_size)
+    elif fmt == "jsonl":
+        reader = pd.read_json(source, lines=True, chunksize=chunk_size, precise_float=True)
+    else:
+        raise ValueError(f"input format must be one of {', '.join(INPUT_FORMATS)}")
+    with reader:
+        yield from reader
+
+
+def score_chunk(df, ab_distribution=False, first_row=0, team_stats=None):
+    """Validate and score one chunk, returning the input columns plus the board."""
+    if team_stats is not None:
+        df = fill_slate(df, team_stats)
+    try:
+        slate = validate_slate(df)
+    except ValueError as e:
+        # validate_slate numbers rows within the chunk.
+        raise ValueError(f"chunk starting at row {first_row + 1}: {e}") from None
+    scored = score_slate(
+        slate["season_avg"].to_numpy(),
+        slate["last7_avg"].to_numpy(),
+        slate["split_avg"].to_numpy(),
+        slate["hand_avg"].to_numpy(),
+        slate["pitcher_avg"].to_numpy(),
+        slate["pitcher_ab"].to_numpy(),
+        slate["batting_order"].to_numpy(),
+        slate["odds"].to_numpy(),
+        ab_distribution=ab_distribution,
+    )
+    board = df.reset_index(drop=True)
+    for column in BOARD_COLUMNS:
+        board[column] = scored[column]
+    return board
+
+
+class _ParquetSink:
+    def __init__(self, target):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet output needs pyarrow (pip install pyarrow)") from None
+        self._pa, self._pq, self._target, self._writer = pa, pq, target, None
+
+    def write(self, board):
+        table = self._pa.Table.from_pandas(board, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._target, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _TextSink:
+    def __init__(self, target, fmt):
+        self._file = target if hasattr(target, "write") else open(target, "w", newline="")
+        self._owns = self._file is not target
+        self._fmt = fmt
+        self._header = True
+
+    def write(self, board):
+        if self._fmt == "csv":
+            board.to_csv(self._file, header=self._header, index=False)
+            self._header = False
+        else:
+            text = board.to_json(orient="records", lines=True)
+            self._file.write(text if text.endswith("\n") else text + "\n")
+
+    def close(self):
+        self._file.flush()
+        if self._owns:
+            self._file.close()
+
+
+def score_stream(source, target, input_format="csv", output_format="csv", chunk_size=DEFAULT_CHUNK_SIZE,
+                 ab_distribution=False, team_stats=None):
+    """Score ``source`` chunk by chunk into ``target``; returns the number of rows."""
+    if output_format not in FORMATS:
+        raise ValueError(f"output format must be one of {', '.join(FORMATS)}")
+    sink = _ParquetSink(target) if output_format == "parquet" else _TextSink(target, output_format)
+    rows = 0
+    try:
+        for df in read_chunks(source, input_format, chunk_size):
+            sink.write(score_chunk(df, ab_distribution, rows, team_stats))
+            rows += len(df)
+    finally:
+        sink.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a slate (CSV or JSON Lines) into a hit board.")
+    parser.add_argument("input", help="input file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, help="default: from the file extension, else csv")
+    parser.add_argument("--output-format", choices=FORMATS, help="default: from the file extension, else csv")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument("--ab-distribution", action="store_true",
+                        help="mix hit probability over each slot's at-bat distribution")
+    parser.add_argument("--team-stats", help="per-player table from moneyball_team_stats (.csv or .parquet) "
+                                             "to fill missing stat columns from")
+    args = parser.parse_args(argv)
+
+    try:
+        input_format = _format(args.input, args.input_format, INPUT_FORMATS)
+        output_format = _format(args.output, args.output_format, FORMATS)
+        if output_format == "parquet" and args.output == "-":
+            raise ValueError("Parquet output needs a file, not stdout")
+        source = sys.stdin if args.input == "-" else args.input
+        target = sys.stdout if args.output == "-" else args.output
+        team_stats = None
+        if args.team_stats:
+            read = pd.read_parquet if args.team_stats.endswith(".parquet") else pd.read_csv
+            team_stats = read(args.team_stats)
+        rows = score_stream(source, target, input_format, output_format, args.chunk_size, args.ab_distribution,
+                            team_stats)
+    except ValueError as e:
+        parser.exit(1, f"error: {e}\n")
+    except BrokenPipeError:
+        # Output piped into head or similar; stop quietly like other filters.
+        sys.stdout = None
+        parser.exit(1)
+    print(f"scored {rows} rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""Columnar store for the Top Hit Board.
+
+The board used to live in ``st.session_state.players`` as a list of
+dicts: roughly a kilobyte of Python objects per player, fully re-sorted
+and re-formatted into a fresh DataFrame of strings on every rerun. A
+``HitBoard`` keeps the players in one NumPy structured array instead
+(float32 percentages, small-int batting order and zone codes, team and
+game labels pooled to int32 codes, names as UTF-8 bytes), grown by
+doubling. Every append, update or remove bumps ``version``; the typed
+frame and the ranked display table are cached against it, so a rerun
+that changed nothing costs nothing. Display tables stay numeric, with
+``BOARD_FORMATS`` giving the printf formats for ``st.column_config``.
+
+Rows are addressed by position (0..len-1, insertion order); every row
+also carries a stable integer ``id`` that survives removals, and an
+id -> position table (one int32 per id ever issued) makes looking a
+player up by id O(1). Widgets should key on ids, not names: the same
+batter can sit on the board twice (another slot, another opponent), and
+``label`` tells such entries apart. Rankings
+(``moneyball_ranking.BoardRanking``) are built on first use for each
+sort order and then kept up to date by every mutation. Parlay
+recommendations priced from the legs' odds are cached separately against
+``pricing_version``, which only moves when a probability or price does.
+"""
+import numpy as np
+import pandas as pd
+
+from moneyball_parlays import top_priced_parlays
+from moneyball_ranking import BoardRanking
+
+ZONES = ("Bad", "Moderate", "Strong", "Elite")
+PCT_FIELDS = ("prob", "ev", "implied", "fair_implied", "fair_ev")
+LABEL_FIELDS = ("team", "game")
+FIELDS = ("name", "prob", "zone", "ev", "odds", "implied", "fair_implied", "fair_ev", "avg", "batting_order",
+          "team", "game")
+# use_fair ranks by the de-vigged column (BoardRanking falls back where there is no fair price).
+_FAIR = {"ev": "fair_ev", "implied": "fair_implied"}
+_NAME_WIDTH = 16
+_MIN_CAPACITY = 16
+
+# Top Hit Board sort orders: display name -> rank fields (each descending).
+RANKINGS = {
+    "True Hit Probability": ("prob", "ev"),
+    "EV%": ("ev", "prob"),
+    "Zone": ("zone", "prob", "ev"),
+}
+
+# printf formats for the numeric display columns (st.column_config.NumberColumn(format=...)).
+BOARD_FORMATS = {
+    "True Hit Probability": "%.1f%%",
+    "Sim Hit Probability": "%.1f%%",
+    "Sim 95% CI (±pts)": "%.2f",
+    "Implied Probability": "%.1f%%",
+    "EV%": "%.1f%%",
+    "Odds": "%+d",
+    "Leg EV%": "%.1f%%",
+    "EV Contribution (pts)": "%+.1f",
+}
+
+
+def _dtype(name_width):
+    return np.dtype([
+        ("id", "i8"), *((field, "f4") for field in PCT_FIELDS), ("avg", "f8"), ("odds", "i4"),
+        ("batting_order", "i1"), ("zone", "i1"), ("team", "i4"), ("game", "i4"), ("name", f"S{name_width}"),
+    ])
+
+
+def zone_code(zone):
+    try:
+        return ZONES.index(zone)
+    except ValueError:
+        raise ValueError(f"zone must be one of {', '.join(ZONES)}, got {zone!r}") from None
+
+
+class HitBoard:
+    """Players on the Top Hit Board, stored column-wise."""
+
+    def __init__(self, players=()):
+        self._rows = np.zeros(0, dtype=_dtype(_NAME_WIDTH))
+        self._size = 0
+        self._next_id = 0
+        self._slots = np.zeros(0, dtype=np.int32)  # id -> row position, -1 once removed
+        self._labels = [None]  # pooled team/game labels; code 0 is "none"
+        self._label_codes = {None: 0}
+        self._cache = {}
+        self._rankings = {}
+        self._priced = {}
+        self.version = 0
+        self.pricing_version = 0
+        if len(players):
+            self.extend(players)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def rows(self):
+        """The live rows as a structured array (a view; do not modify)."""
+        return self._rows[:self._size]
+
+    def column(self, field):
+        """One column of the live rows: float/int array, or str list for name, zone, team and game."""
+        values = self.rows[field]
+        if field == "name":
+            return np.char.decode(values, "utf-8").tolist()
+        if field == "zone":
+            return [ZONES[code] for code in values.tolist()]
+        if field in LABEL_FIELDS:
+            return [self._labels[code] for code in values.tolist()]
+        return values
+
+    # --- Mutation ---
+
+    def _changed(self, pricing=True):
+        self.version += 1
+        self._cache.clear()
+        if pricing:
+            self.pricing_version += 1
+            self._priced.clear()
+
+    def _label_code(self, label):
+        label = label.strip() if isinstance(label, str) and label.strip() else None
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self._labels)
+            self._labels.append(label)
+        return code
+
+    def _encode_names(self, names):
+        encoded = [str(name).encode("utf-8") for name in names]
+        width = max(map(len, encoded), default=0)
+        if width > self._rows.dtype["name"].itemsize:
+            self._rows = self._rows.astype(_dtype(max(width, 2 * self._rows.dtype["name"].itemsize)))
+        return encoded
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed > len(self._rows):
+            grown = np.zeros(max(needed, 2 * len(self._rows), _MIN_CAPACITY), dtype=self._rows.dtype)
+            grown[:self._size] = self._rows[:self._size]
+            self._rows = grown
+
+    def extend(self, players):
+        """Append players (a list of board dicts or a DataFrame with ``FIELDS`` columns); returns their ids."""
+        df = players if isinstance(players, pd.DataFrame) else pd.DataFrame(list(players))
+        if len(df) == 0:
+            return np.empty(0, dtype=np.int64)  # e.g. a header-only slate upload
+        missing = [field for field in ("name", "prob", "zone", "ev", "odds", "implied") if field not in df.columns]
+        if missing:
+            raise ValueError(f"players are missing {', '.join(missing)}")
+        n = len(df)
+        names = self._encode_names(df["name"].tolist())
+        self._reserve(n)
+        if self._next_id + n > len(self._slots):
+            slots = np.full(max(self._next_id + n, 2 * len(self._slots), _MIN_CAPACITY), -1, dtype=np.int32)
+            slots[:len(self._slots)] = self._slots
+            self._slots = slots
+        self._slots[self._next_id:self._next_id + n] = np.arange(self._size, self._size + n)
+        new = self._rows[self._size:self._size + n]
+        new["id"] = np.arange(self._next_id, self._next_id + n)
+        for field in PCT_FIELDS + ("avg",):
+            new[field] = pd.to_numeric(df[field], errors="coerce") if field in df.columns else np.nan
+        new["odds"] = df["odds"].to_numpy()
+        new["batting_order"] = df["batting_order"].fillna(0).to_numpy() if "batting_order" in df.columns else 0
+        new["zone"] = [zone_code(zone) for zone in df["zone"].tolist()]
+        for field in LABEL_FIELDS:
+            new[field] = [self._label_code(label) for label in df[field].tolist()] if field in df.columns else 0
+        new["name"] = names
+        self._size += n
+        self._next_id += n
+        for ranking in self._rankings.values():
+            ranking.add(new)
+        self._changed()
+        return new["id"].copy()
+
+    def append(self, player):
+        """Append one board dict; returns its id."""
+        return int(self.extend([player])[0])
+
+    def update(self, row, **fields):
+        """Overwrite fields of the player at position ``row``."""
+        if not 0 <= row < self._size:
+            raise IndexError(f"board row {row} out of range")
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"unknown board fields: {', '.join(sorted(unknown))}")
+        if "name" in fields:
+            fields["name"] = self._encode_names([fields["name"]])[0]
+        if "zone" in fields:
+            fields["zone"] = zone_code(fields["zone"])
+        for field in LABEL_FIELDS:
+            if field in fields:
+                fields[field] = self._label_code(fields[field])
+        for field, value in fields.items():
+            self._rows[field][row] = np.nan if value is None and field in PCT_FIELDS + ("avg",) else value
+        for ranking in self._rankings.values():
+            ranking.refresh(self._rows[row])
+        self._changed(pricing=bool({"prob", "odds"} & set(fields)))
+
+    def remove(self, rows):
+        """Delete the players at the given positions; later rows shift down."""
+        rows = np.unique(np.atleast_1d(np.asarray(rows, dtype=np.intp)))
+        if not len(rows):
+            return
+        if rows[0] < 0 or rows[-1] >= self._size:
+            raise IndexError("board row out of range")
+        for ranking in self._rankings.values():
+            ranking.discard(self._rows["id"][rows])
+        self._slots[self._rows["id"][rows]] = -1
+        keep = np.ones(self._size, dtype=bool)
+        keep[rows] = False
+        kept = self._rows[:self._size][keep]
+        self._rows[:len(kept)] = kept
+        self._size = len(kept)
+        first = rows[0]
+        self._slots[self._rows["id"][first:self._size]] = np.arange(first, self._size)
+        self._changed()
+
+    def clear(self):
+        self._slots[:] = -1
+        self._size = 0
+        self._rankings.clear()
+        self._changed()
+
+    # --- Reads ---
+
+    def record(self, row):
+        """The player at position ``row`` as a board dict (None for missing values)."""
+        if not 0 <= row < self._size:
+            raise IndexError(f"board row {row} out of range")
+        r = self._rows[row]
+        player = {
+            "id": int(r["id"]),
+            "name": r["name"].decode("utf-8"),
+            **{field: (None if np.isnan(r[field]) else round(float(r[field]), 1)) for field in PCT_FIELDS},
+            "zone": ZONES[r["zone"]],
+            "odds": int(r["odds"]),
+            "avg": None if np.isnan(r["avg"]) else float(r["avg"]),
+            "batting_order": int(r["batting_order"]) or None,
+        }
+        player.update((field, self._labels[r[field]]) for field in LABEL_FIELDS)
+        return player
+
+    def _cached(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def ids(self):
+        """Board ids in row order, e.g. as widget options."""
+        return self._cached("ids", lambda: self.rows["id"].tolist())
+
+    def position(self, player_id):
+        """Row position of the player with this board id."""
+        if not 0 <= player_id < self._next_id or self._slots[player_id] < 0:
+            raise KeyError(f"no player with board id {player_id}")
+        return int(self._slots[player_id])
+
+    def positions(self, ids):
+        """Row positions for an array of live board ids."""
+        return self._slots[np.asarray(ids, dtype=np.int64)]
+
+    def player(self, player_id):
+        """The player with this board id as a board dict."""
+        return self.record(self.position(player_id))
+
+    def priced_parlays(self, legs=2, top_n=3):
+        """Best parlays by expected return at the legs' own odds (``top_priced_parlays``), legs as board ids.
+
+        Cached until a probability or price on the board changes.
+        """
+        key = (legs, top_n)
+        if key not in self._priced:
+            rows = self.rows
+            best = top_priced_parlays(rows["prob"].astype(float).round(1) / 100, rows["odds"], legs, top_n)
+            for parlay in best:
+                parlay["legs"] = tuple(rows["id"][list(parlay["legs"])].tolist())
+            self._priced[key] = best
+        return self._priced[key]
+
+    def leg(self, player_id):
+        """(true hit probability 0-1, American odds) of a board id, as a parlay leg."""
+        row = self._rows[self.position(player_id)]
+        return round(float(row["prob"]), 1) / 100, int(row["odds"])
+
+    def parlay_table(self, parlay):
+        """Per-leg breakdown of a ``moneyball_parlays.Parlay`` keyed by board ids."""
+        legs = parlay.legs()
+        return pd.DataFrame({
+            "Leg": [self.label(leg["key"]) for leg in legs],
+            "True Hit Probability": [leg["prob"] * 100 for leg in legs],
+            "Odds": [int(self._rows["odds"][self.position(leg["key"])]) for leg in legs],
+            "Leg EV%": [leg["ev"] for leg in legs],
+            "EV Contribution (pts)": [leg["contribution"] for leg in legs],
+        }).astype({"Leg EV%": float, "EV Contribution (pts)": float})
+
+    def _duplicate_names(self):
+        def build():
+            names, counts = np.unique(self.rows["name"], return_counts=True)
+            return set(names[counts > 1].tolist())
+        return self._cached("duplicate_names", build)
+
+    def label(self, player_id):
+        """Display name for a board id; repeated names get the id appended so entries stay distinct."""
+        name = self._rows["name"][self.position(player_id)]
+        label = name.decode("utf-8")
+        return f"{label} [id {player_id}]" if name in self._duplicate_names() else label
+
+    def ranking(self, by=RANKINGS["True Hit Probability"]):
+        """The live ``BoardRanking`` for this sort order, built on first use."""
+        by = tuple(by)
+        if by not in self._rankings:
+            ranking = self._rankings[by] = BoardRanking(by)
+            ranking.load(self.rows)
+        return self._rankings[by]
+
+    def rank(self, row, by=RANKINGS["True Hit Probability"]):
+        """1-based rank of the player at position ``row``."""
+        return self.ranking(by).rank(int(self.rows["id"][row]))
+
+    def frame(self):
+        """The board as a typed DataFrame (float percentages, ordered categorical zone)."""
+        def build():
+            rows = self.rows
+            df = pd.DataFrame({"id": rows["id"], "name": self.column("name")})
+            for field in FIELDS[1:]:
+                df[field] = rows[field].astype(float).round(1) if field in PCT_FIELDS else rows[field]
+            df["zone"] = pd.Categorical.from_codes(rows["zone"], categories=ZONES, ordered=True)
+            for field in LABEL_FIELDS:
+                df[field] = pd.Categorical.from_codes(rows[field] - 1, categories=self._labels[1:])
+            return df
+        return self._cached("frame", build)
+
+    def table(self, use_fair=False, sim=None, by=RANKINGS["True Hit Probability"], top=None):
+        """Ranked display table for the Top Hit Board, cached until the board changes.
+
+        Rows come from ``ranking(by)``, limited to the ``top`` best if given,
+        so only the rows shown are read. ``use_fair`` shows de-vigged implied
+        probability and EV (and ranks by them) where a fair price exists.
+        ``sim(avgs, slots)`` adds game-simulation columns; it must return
+        ``{(avg, slot): (prob, ci)}`` and be deterministic for a given board,
+        since its result is cached with the table.
+        """
+        by = tuple(_FAIR.get(field, field) for field in by) if use_fair else tuple(by)
+
+        def build():
+            rows = self.rows[self.positions(self.ranking(by).top(top))]
+            table = pd.DataFrame({
+                "Rank": np.arange(1, len(rows) + 1),
+                "Player": np.char.decode(rows["name"], "utf-8").tolist(),
+                "True Hit Probability": rows["prob"].astype(float).round(1),
+            })
+            if sim is not None:
+                avgs, slots = rows["avg"].tolist(), rows["batting_order"].tolist()
+                keys = sorted({key for key in zip(avgs, slots) if not np.isnan(key[0])})
+                results = sim(tuple(k[0] for k in keys), tuple(k[1] for k in keys)) if keys else {}
+                pairs = [results.get(key, (np.nan, np.nan)) for key in zip(avgs, slots)]
+                sim_probs, cis = np.array(pairs, dtype=float).reshape(-1, 2).T
+                table["Sim Hit Probability"] = sim_probs * 100
+                table["Sim 95% CI (±pts)"] = cis * 100
+            implied, ev = rows["implied"], rows["ev"]
+            if use_fair:
+                fair = ~np.isnan(rows["fair_implied"])
+                implied = np.where(fair, rows["fair_implied"], implied)
+                ev = np.where(fair, rows["fair_ev"], ev)
+            table["Implied Probability"] = implied.astype(float).round(1)
+            table["EV%"] = ev.astype(float).round(1)
+            table["Zone"] = pd.Categorical.from_codes(rows["zone"], categories=ZONES, ordered=True)
+            return table
+        return self._cached(("table", bool(use_fair), sim is not None, by, top), build)
+
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    n = 100_000
+    rng = np.random.default_rng(0)
+    probs = rng.uniform(40, 90, n).round(1)
+    odds = rng.integers(-400, 200, n)
+    avgs = rng.uniform(0.2, 0.33, n)
+
+    def make_players():
+        return [
+            {"name": f"Player {i} (Batting #{i % 9 + 1}) vs RHP", "prob": p, "zone": ZONES[(p > 60) + (p > 70) + (p > 80)],
+             "ev": round(p - 55, 1), "odds": o, "implied": 55.0, "fair_implied": 53.1, "fair_ev": round(p - 53.1, 1),
+             "avg": a, "batting_order": i % 9 + 1, "team": f"T{i % 30}", "game": f"G{i % 15}"}
+            for i, (p, o, a) in enumerate(zip(probs.tolist(), odds.tolist(), avgs.tolist()))
+        ]
+
+    def measure(build):
+        tracemalloc.start()
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, size
+
+    empty = HitBoard()
+    assert len(empty.extend([])) == 0 and len(empty) == 0
+
+    dicts, dict_bytes = measure(make_players)
+    board, board_bytes = measure(lambda: HitBoard(make_players()))
+    print(f"memory per player: list of dicts {dict_bytes / n:.0f} B, HitBoard {board_bytes / n:.0f} B")
+
+    def old_rerun():
+        return pd.DataFrame([
+            {"Rank": i + 1, "Player": p["name"], "True Hit Probability": f"{p['prob']}%",
+             "Implied Probability": f"{p['implied']}%", "EV%": f"{p['ev']}%", "Zone": p["zone"]}
+            for i, p in enumerate(sorted(dicts, key=lambda x: x["prob"], reverse=True))
+        ])
+
+    for label, rerun in (("list of dicts", old_rerun), ("HitBoard (first)", board.table), ("HitBoard (cached)", board.table)):
+        start = time.perf_counter()
+        rerun()
+        print(f"{label:>18}: board render {(time.perf_counter() - start) * 1000:8.2f} ms")
+    assert board.table()["Player"].tolist() == old_rerun()["Player"].tolist()
+
+    legs = rng.integers(0, n, 3).tolist()
+    leg_ids = [board.ids()[i] for i in legs]  # what the multiselect hands back
+    leg_names = [dicts[i]["name"] for i in legs]
+    start = time.perf_counter()
+    scanned = [next(p for p in dicts if p["name"] == name) for name in leg_names]
+    scan = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [board.player(player_id) for player_id in leg_ids]
+    lookup = time.perf_counter() - start
+    assert [p["name"] for p in indexed] == [p["name"] for p in scanned]
+    print(f"3-leg lookup: next() scan {scan * 1000:.2f} ms, id index {lookup * 1000:.3f} ms")
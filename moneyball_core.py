@@ -0,0 +1,157 @@
+"""Headless scoring API for the Moneyball Phil model.
+
+The formulas the Streamlit apps used to define inline, with type hints and
+no UI, pandas or NumPy import: ``import moneyball_core`` and scoring one
+player takes a few milliseconds, so batch jobs and services can use the
+model without Streamlit. The apps import these functions instead of
+keeping their own copies.
+
+Column-at-a-time versions (``score_slate`` and the ``*_batch`` helpers)
+live in ``moneyball_scoring``, which needs NumPy; they are re-exported
+here and only imported on first use.
+"""
+from __future__ import annotations
+
+import math
+
+from moneyball_odds import american_to_implied
+
+# --- Weights ---
+SEASON_WEIGHT = 0.4
+RECENT_WEIGHT = 0.3
+SPLIT_WEIGHT = 0.3
+HAND_WEIGHT = 0.2
+
+# --- Batting Order AB Averages ---
+batting_order_ab_lookup = {
+    1: 4.7, 2: 4.6, 3: 4.5, 4: 4.4, 5: 4.2, 6: 4.1, 7: 3.9, 8: 3.8, 9: 3.7
+}
+
+# --- At-Bat Distributions ---
+# Each slot's at-bat count is modelled as MIN_AB + Binomial(MAX_AB - MIN_AB, q),
+# with q chosen so the mean equals the slot's batting_order_ab_lookup value.
+# Mixing over whole at-bats avoids the fractional exponent (4.7 ABs) and the
+# lost slot difference from rounding (round(4.4) == round(4.6)).
+MIN_AB = 2
+MAX_AB = 6
+
+
+def _ab_distribution(mean_ab: float) -> tuple[tuple[int, float], ...]:
+    trials = MAX_AB - MIN_AB
+    q = (mean_ab - MIN_AB) / trials
+    return tuple(
+        (MIN_AB + k, math.comb(trials, k) * q ** k * (1 - q) ** (trials - k))
+        for k in range(trials + 1)
+    )
+
+
+ab_distribution_lookup = {slot: _ab_distribution(ab) for slot, ab in batting_order_ab_lookup.items()}
+# Weights from MAX_AB down to MIN_AB, ready for Horner evaluation in (1 - avg).
+_horner_weights = {slot: tuple(w for _, w in reversed(dist)) for slot, dist in ab_distribution_lookup.items()}
+
+ZONE_THRESHOLDS = (0.6, 0.7, 0.8)
+
+# --- Pitcher Difficulty ---
+# Opposing starter tiers from ERA/WHIP and the weighted-AVG adjustment each gets.
+PITCHER_ADJUSTMENT = {"Easy": 0.020, "Average": 0.000, "Tough": -0.020}
+PITCHER_TIER_LABELS = {"Easy": "🟢 Easy Pitcher", "Average": "🟨 Average Pitcher", "Tough": "🔴 Tough Pitcher"}
+
+
+def pitcher_weight(pitcher_ab: int) -> float:
+    return 0.3 if pitcher_ab >= 7 else 0.1 if pitcher_ab > 0 else 0
+
+
+def calculate_weighted_avg(season: float, last7: float, split: float, hand_avg: float | None = None,
+                           pitcher_avg: float | None = None, pitcher_ab: int = 0) -> float:
+    p_weight = pitcher_weight(pitcher_ab)
+    total_weight = SEASON_WEIGHT + RECENT_WEIGHT + SPLIT_WEIGHT + p_weight + HAND_WEIGHT
+    weighted_sum = (
+        season * SEASON_WEIGHT +
+        last7 * RECENT_WEIGHT +
+        split * SPLIT_WEIGHT +
+        (pitcher_avg * p_weight if pitcher_avg is not None else 0) +
+        (hand_avg * HAND_WEIGHT if hand_avg is not None else 0)
+    )
+    return weighted_sum / total_weight
+
+
+def pitcher_difficulty(era: float, whip: float) -> tuple[float, str]:
+    """Weighted-AVG adjustment and tier ("Easy", "Average" or "Tough") for a starter."""
+    if whip >= 1.40 or era >= 5.00:
+        tier = "Easy"
+    elif whip < 1.10 or era < 3.50:
+        tier = "Tough"
+    else:
+        tier = "Average"
+    return PITCHER_ADJUSTMENT[tier], tier
+
+
+def binomial_hit_probability(avg: float, ab: float) -> float:
+    prob_no_hit = (1 - avg) ** ab
+    return 1 - prob_no_hit
+
+
+def slot_hit_probability(avg: float, batting_order: int) -> float:
+    """P(at least one hit) mixed over the slot's at-bat distribution."""
+    miss = 1 - avg
+    prob_no_hit = 0.0
+    for weight in _horner_weights[batting_order]:
+        prob_no_hit = prob_no_hit * miss + weight
+    return 1 - prob_no_hit * miss ** MIN_AB
+
+
+def calculate_parlay_probability(*probs: float) -> float:
+    """Product of independent leg probabilities (any number of legs)."""
+    result = 1.0
+    for p in probs:
+        result *= p
+    return result
+
+
+def classify_zone(prob: float) -> str:
+    return "Elite" if prob > 0.8 else "Strong" if prob > 0.7 else "Moderate" if prob > 0.6 else "Bad"
+
+
+get_zone = classify_zone
+
+
+def score_player(season: float, last7: float, split: float, hand_avg: float | None = None,
+                 pitcher_avg: float | None = None, pitcher_ab: int = 0, batting_order: int = 1,
+                 odds: int = 0) -> dict[str, float | str]:
+    """Score one batter the way the "Simulate Player" form does."""
+    weighted_avg = calculate_weighted_avg(season, last7, split, hand_avg, pitcher_avg, pitcher_ab)
+    true_hit_prob = binomial_hit_probability(weighted_avg, batting_order_ab_lookup[batting_order])
+    implied_prob = american_to_implied(odds)
+    return {
+        "weighted_avg": weighted_avg,
+        "prob": true_hit_prob,
+        "implied": implied_prob,
+        "ev": (true_hit_prob - implied_prob) * 100,
+        "zone": classify_zone(true_hit_prob),
+    }
+
+
+_BATCH = ("score_slate", "weighted_avg_batch", "binomial_hit_probability_batch", "slot_hit_probability_batch",
+          "expected_ab_batch", "classify_zone_batch")
+
+
+def __getattr__(name):
+    if name in _BATCH:
+        import moneyball_scoring
+
+        return getattr(moneyball_scoring, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if __name__ == "__main__":
+    import subprocess
+    import sys
+
+    # Fresh interpreters, so nothing is already imported.
+    code = ("import time; t = time.perf_counter(); import moneyball_core; "
+            "moneyball_core.score_player(0.285, 0.310, 0.270, 0.300, 0.250, 8, 2, -180); "
+            "print((time.perf_counter() - t) * 1000, 'numpy' in __import__('sys').modules)")
+    runs = [subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+            for _ in range(5)]
+    best = min(float(ms) for ms, _ in runs)
+    print(f"import + score one player: {best:.1f} ms (numpy imported: {runs[0][1]})")
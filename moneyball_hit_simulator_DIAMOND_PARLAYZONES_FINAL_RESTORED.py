@@ -1,27 +1,12 @@
 
 import streamlit as st
-import base64
 import pandas as pd
 
-# Set up background
-def set_background(img_file):
-    with open(img_file, "rb") as f:
-        img_bytes = f.read()
-    encoded = base64.b64encode(img_bytes).decode()
-    css = f'''
-    <style>
-    .stApp {{
-        background-image: url("data:image/png;base64,{encoded}");
-        background-size: cover;
-        background-position: center;
-        background-attachment: fixed;
-    }}
-    </style>
-    '''
-    st.markdown(css, unsafe_allow_html=True)
+from moneyball_assets import image_variant, set_background
 
+# Set up background
 set_background("baseball_diamond_bg.png")
-st.image("moneyball_logo.png", width=180)
+st.image(image_variant("moneyball_logo.png", 180), width=180)
 st.title("💰 Moneyball Phil: Daily Hit Probability Simulator")
 
 with st.form("player_form"):
@@ -1,9 +1,16 @@
 
 import streamlit as st
-import requests
 import pandas as pd
 import math
 
+from moneyball_assets import image_variant
+from moneyball_board import BOARD_FORMATS, RANKINGS, HitBoard
+from moneyball_odds import american_to_implied
+from moneyball_parlays import Parlay
+from moneyball_stats_cache import default_cache
+from moneyball_stats_client import IN_FLIGHT, StatsFetchError
+from moneyball_team_stats import prefill_stats
+
 # --- Helper Functions ---
 def calculate_weighted_avg(season, last7, split, pitcher_avg=None, pitcher_ab=0):
     pitcher_weight = 0.3 if pitcher_ab >= 7 else 0.1 if pitcher_ab > 0 else 0
@@ -23,59 +30,55 @@ def binomial_hit_probability(avg, ab=4):
     prob_no_hit = (1 - avg) ** ab
     return 1 - prob_no_hit
 
-def american_to_implied(odds):
-    if odds < 0:
-        return abs(odds) / (abs(odds) + 100)
-    else:
-        return 100 / (odds + 100)
-
-def calculate_parlay_probability(prob_list):
-    result = 1
-    for p in prob_list:
-        result *= p
-    return result
-
-def fetch_mlb_stats(player_name):
-    # Simulate MLB StatsAPI fetch for example purposes (fake data here)
-    # Replace this section with actual API call and parsing logic if available
-    fake_data = {
-        "season_avg": 0.287,
-        "last7_avg": 0.320,
-        "split_avg": 0.298
-    }
-    return fake_data
-
 # --- Background and Logo ---
 st.markdown(
     f"<style>body {{background-image: url('background.png'); background-size: cover;}}</style>",
     unsafe_allow_html=True
 )
-st.image("moneyball_logo.png", width=160)
+st.image(image_variant("moneyball_logo.png", 160), width=160)
 st.title("💰 Moneyball Phil: Daily Hit Probability Simulator")
 
 # --- Session State ---
 if 'players' not in st.session_state:
-    st.session_state.players = []
+    st.session_state.players = HitBoard()
+if 'parlay' not in st.session_state:
+    st.session_state.parlay = Parlay()
 
 # --- Player Input ---
 st.header("📥 Player Stat Input")
 with st.form("player_input_form"):
     name = st.text_input("Player Name")
+    pitcher_name = st.text_input("Opposing Pitcher (optional)")
+    home = st.checkbox("Home Game", value=True)
     fetch = st.form_submit_button("Fetch Stats")
 
-    season_avg = st.number_input("Season AVG", min_value=0.0, max_value=1.0, step=0.0001, format="%.4f")
-    last7_avg = st.number_input("Last 7 Days AVG", min_value=0.0, max_value=1.0, step=0.0001, format="%.4f")
-    split_avg = st.number_input("Home/Away or vs AL/NL AVG", min_value=0.0, max_value=1.0, step=0.0001, format="%.4f")
-    pitcher_avg = st.number_input("Batter’s AVG vs Starting Pitcher", min_value=0.0, max_value=1.0, step=0.0001, format="%.4f")
-    pitcher_ab = st.number_input("At-Bats vs Pitcher", min_value=0, step=1)
-    odds = st.number_input("Sportsbook Odds (American)", step=1)
-
     if fetch and name:
-        stats = fetch_mlb_stats(name)
-        season_avg = stats['season_avg']
-        last7_avg = stats['last7_avg']
-        split_avg = stats['split_avg']
-        st.experimental_rerun()
+        try:
+            stats = prefill_stats(name, home=home, pitcher_name=pitcher_name or None)
+        except StatsFetchError as e:
+            st.error(f"Could not fetch stats for {name}: {e}")
+        else:
+            # Prefill the inputs below (not drawn yet on this run). A missing line is
+            # cleared, not left holding the previous player's value.
+            missing = []
+            for key, label in (("season_avg", "season"), ("last7_avg", "last 7 days"),
+                               ("split_avg", "home/away split"), ("pitcher_avg", None)):
+                value = stats[key]
+                if value is None or math.isnan(value):
+                    value = 0.0
+                    if label:  # no matchup history is normal for the pitcher line
+                        missing.append(label)
+                st.session_state[key] = float(value)
+            st.session_state.pitcher_ab = stats["pitcher_ab"]
+            if missing:
+                st.warning(f"No {', '.join(missing)} AVG found for {name}; set to 0.0000, enter it before simulating.")
+
+    season_avg = st.number_input("Season AVG", min_value=0.0, max_value=1.0, step=0.0001, format="%.4f", key="season_avg")
+    last7_avg = st.number_input("Last 7 Days AVG", min_value=0.0, max_value=1.0, step=0.0001, format="%.4f", key="last7_avg")
+    split_avg = st.number_input("Home/Away or vs AL/NL AVG", min_value=0.0, max_value=1.0, step=0.0001, format="%.4f", key="split_avg")
+    pitcher_avg = st.number_input("Batter’s AVG vs Starting Pitcher", min_value=0.0, max_value=1.0, step=0.0001, format="%.4f", key="pitcher_avg")
+    pitcher_ab = st.number_input("At-Bats vs Pitcher", min_value=0, step=1, key="pitcher_ab")
+    odds = st.number_input("Sportsbook Odds (American)", step=1)
 
     weighted_avg = calculate_weighted_avg(season_avg, last7_avg, split_avg, pitcher_avg, pitcher_ab)
     st.markdown(f"**Weighted Batting Average:** `{round(weighted_avg, 4)}`")
@@ -91,41 +94,54 @@ with st.form("player_input_form"):
             "prob": round(true_hit_prob * 100, 1),
             "implied": round(implied_prob * 100, 1),
             "ev": round(ev, 1),
-            "zone": zone
+            "zone": zone,
+            "odds": odds
         })
 
+stats_cache = default_cache().stats()
+st.caption(f"📦 Stats cache: {stats_cache['hits']} hits, {stats_cache['revalidated']} revalidated, "
+           f"{stats_cache['misses']} fetched ({stats_cache['hit_rate']:.0%} hit rate, {stats_cache['entries']} stored), "
+           f"{IN_FLIGHT.stats()['shared']} shared with other sessions")
+
 # --- Top Hit Board ---
 st.header("🔥 Top Hit Board")
 if not st.session_state.players:
     st.info("No players simulated yet.")
 else:
-    sorted_players = sorted(st.session_state.players, key=lambda x: x['prob'], reverse=True)
-    st.table([
-        {
-            "Rank": i+1,
-            "Player": p["name"],
-            "True Hit Probability": f"{p['prob']}%",
-            "Implied Probability": f"{p['implied']}%",
-            "EV%": f"{p['ev']}%",
-            "Zone": p["zone"]
-        } for i, p in enumerate(sorted_players)
-    ])
-
-# --- Parlay Builder (up to 3 legs) ---
+    rank_by = st.selectbox("Rank by", list(RANKINGS), key="rank_by")
+    top_n = st.number_input("Players shown (0 = all)", min_value=0, step=10, key="board_top")
+    st.dataframe(st.session_state.players.table(by=RANKINGS[rank_by], top=top_n or None), use_container_width=True,
+                 column_config={column: st.column_config.NumberColumn(format=fmt) for column, fmt in BOARD_FORMATS.items()})
+
+# --- Parlay Builder ---
 st.header("🧮 Parlay Builder")
 if len(st.session_state.players) >= 2:
-    names = [p["name"] for p in st.session_state.players]
-    selections = st.multiselect("Select 2 or 3 Players", names, max_selections=3)
-    if len(selections) >= 2:
-        selected_probs = [p["prob"]/100 for p in st.session_state.players if p["name"] in selections]
+    board = st.session_state.players
+    selected_players = st.multiselect("Select Players (2 or more)", board.ids(), format_func=board.label, key="parlay_legs")
+
+    if len(selected_players) >= 2:
         parlay_odds = st.number_input("Enter Parlay Odds (American)", step=1, key="parlay_odds")
-        true_parlay_prob = calculate_parlay_probability(selected_probs)
+
+        parlay = st.session_state.parlay
+        parlay.sync(selected_players, board.leg, version=board.version)
+        true_parlay_prob = parlay.prob
         implied_parlay_prob = american_to_implied(parlay_odds)
-        ev_parlay = (true_parlay_prob - implied_parlay_prob) * 100
+        ev_parlay = parlay.ev(implied_parlay_prob)
+
         st.markdown(f"**True Parlay Probability:** {round(true_parlay_prob * 100, 1)}%")
         st.markdown(f"**Implied Probability:** {round(implied_parlay_prob * 100, 1)}%")
         st.markdown(f"**Expected Value (EV%):** {round(ev_parlay, 1)}%")
+        if parlay.decimal_odds is not None:
+            st.markdown(f"**Priced from Leg Odds:** {parlay.decimal_odds:.2f} decimal, EV% {round(parlay.ev(), 1)}%")
+
         if ev_parlay > 0:
             st.success("✅ This is a +EV Parlay!")
         else:
             st.error("❌ Negative EV Parlay")
+
+        st.dataframe(board.parlay_table(parlay), use_container_width=True,
+                     column_config={column: st.column_config.NumberColumn(format=fmt) for column, fmt in BOARD_FORMATS.items()})
+    else:
+        st.warning("Please select at least 2 different players.")
+else:
+    st.info("Add at least 2 players to use the Parlay Builder.")
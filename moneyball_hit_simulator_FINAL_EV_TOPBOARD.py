@@ -1,43 +1,16 @@
 import streamlit as st
 import math
 
-# --- Helper Functions ---
-def calculate_weighted_avg(season, last7, split, hand_avg=None, pitcher_avg=None, pitcher_ab=0):
-    pitcher_weight = 0.3 if pitcher_ab >= 7 else 0.1 if pitcher_ab > 0 else 0
-    hand_weight = 0.2
-    season_weight = 0.4
-    recent_weight = 0.3
-    split_weight = 0.3
-
-    total_weight = season_weight + recent_weight + split_weight + pitcher_weight + hand_weight
-    weighted_sum = (
-        season * season_weight +
-        last7 * recent_weight +
-        split * split_weight +
-        (pitcher_avg * pitcher_weight if pitcher_avg is not None else 0) +
-        (hand_avg * hand_weight if hand_avg is not None else 0)
-    )
-    return weighted_sum / total_weight
-
-def binomial_hit_probability(avg, ab):
-    prob_no_hit = (1 - avg) ** ab
-    return 1 - prob_no_hit
-
-def american_to_implied(odds):
-    if odds < 0:
-        return abs(odds) / (abs(odds) + 100)
-    else:
-        return 100 / (odds + 100)
-
-def calculate_parlay_probability(p1, p2):
-    return p1 * p2
+from moneyball_assets import image_variant
+from moneyball_core import binomial_hit_probability, calculate_parlay_probability, calculate_weighted_avg
+from moneyball_odds import american_to_implied
 
 # --- Session State ---
 if 'players' not in st.session_state:
     st.session_state.players = []
 
 # --- Title ---
-st.image("moneyball_logo.png", width=160)
+st.image(image_variant("moneyball_logo.png", 160), width=160)
 st.title("💰 Moneyball Phil: Daily Hit Probability Simulator")
 
 # --- Batting Order AB Averages ---
@@ -1,30 +1,16 @@
 
 import streamlit as st
 import pandas as pd
-import base64
+
+from moneyball_assets import image_variant, set_background
 
 # Set page config
 st.set_page_config(layout="wide", page_title="Moneyball Phil")
 
 # Load logo
-st.image("moneyball_logo.png", width=160)
+st.image(image_variant("moneyball_logo.png", 160), width=160)
 
 # Set custom background
-def set_background(image_file):
-    with open(image_file, "rb") as f:
-        data = f.read()
-    encoded = base64.b64encode(data).decode()
-    page_bg_img = f'''
-    <style>
-    .stApp {{
-      background-image: url("data:image/png;base64,{encoded}");
-      background-size: cover;
-      background-position: center;
-    }}
-    </style>
-    '''
-    st.markdown(page_bg_img, unsafe_allow_html=True)
-
 set_background("baseball_diamond_bg.png")
 
 st.title("💰 Moneyball Phil: Daily Hit Probability Simulator")
@@ -3,6 +3,8 @@ import streamlit as st
 import pandas as pd
 import base64
 
+from moneyball_assets import image_variant
+
 # --- Set up background and logo ---
 def add_bg_and_logo():
     with open("baseball_diamond_bg.png", "rb") as bg_file:
@@ -19,7 +21,7 @@ def add_bg_and_logo():
     </style>
     '''
     st.markdown(page_bg_img, unsafe_allow_html=True)
-    st.image("moneyball_logo.png", width=160)
+    st.image(image_variant("moneyball_logo.png", 160), width=160)
 
 add_bg_and_logo()
 
@@ -1,29 +1,15 @@
 
 import streamlit as st
-import base64
 import pandas as pd
 
-st.set_page_config(page_title="Moneyball Phil Hit Simulator", layout="centered")
+from moneyball_assets import image_variant, set_background
+from moneyball_odds import american_to_implied
 
-def set_background(image_file):
-    with open(image_file, "rb") as f:
-        data = base64.b64encode(f.read()).decode()
-    css = f'''
-    <style>
-    .stApp {{
-        background-image: url("data:image/png;base64,{data}");
-        background-size: cover;
-        background-repeat: no-repeat;
-        background-attachment: fixed;
-        background-position: center;
-    }}
-    </style>
-    '''
-    st.markdown(css, unsafe_allow_html=True)
+st.set_page_config(page_title="Moneyball Phil Hit Simulator", layout="centered")
 
 set_background("background.png")
 
-st.image("moneyball_logo.png", width=180)
+st.image(image_variant("moneyball_logo.png", 180), width=180)
 st.title("💰 Moneyball Phil: Hit Probability Simulator")
 
 st.header("📥 Player Stat Entry")
@@ -53,9 +39,6 @@ def calculate_weighted_avg(season, last7, split, hand, pitcher):
 def binomial_hit_probability(avg, ab=4):
     return round(1 - (1 - avg)**ab, 4)
 
-def american_to_implied(odds):
-    return round(abs(odds) / (abs(odds) + 100), 4) if odds < 0 else round(100 / (odds + 100), 4)
-
 def classify_zone(prob):
     if prob >= 0.8:
         return "🟩 Elite"
@@ -1,6 +1,10 @@
 import streamlit as st
 import math
 
+from moneyball_assets import image_variant
+from moneyball_core import binomial_hit_probability, calculate_parlay_probability
+from moneyball_odds import american_to_implied
+
 # --- Helper Functions ---
 def calculate_weighted_avg(season, last7, split, pitcher_avg=None, pitcher_ab=0):
     pitcher_weight = 0.3 if pitcher_ab >= 7 else 0.1 if pitcher_ab > 0 else 0
@@ -17,25 +21,12 @@ def calculate_weighted_avg(season, last7, split, pitcher_avg=None, pitcher_ab=0)
     )
     return weighted_sum / total_weight
 
-def binomial_hit_probability(avg, ab):
-    prob_no_hit = (1 - avg) ** ab
-    return 1 - prob_no_hit
-
-def american_to_implied(odds):
-    if odds < 0:
-        return abs(odds) / (abs(odds) + 100)
-    else:
-        return 100 / (odds + 100)
-
-def calculate_parlay_probability(p1, p2):
-    return p1 * p2
-
 # --- Session State ---
 if 'players' not in st.session_state:
     st.session_state.players = []
 
 # --- Title ---
-st.image("moneyball_logo.png", width=160)
+st.image(image_variant("moneyball_logo.png", 160), width=160)
 st.title("💰 Moneyball Phil: Daily Hit Probability Simulator")
 
 # --- Batting Order AB Averages ---
@@ -3,28 +3,15 @@ import streamlit as st
 import base64
 import pandas as pd
 
+from moneyball_assets import image_variant, set_background
+
 # Set page config
 st.set_page_config(page_title="Moneyball Phil: Daily Hit Probability Simulator", layout="wide")
 
 # Load and display logo
-st.image("moneyball_logo.png", width=200)
+st.image(image_variant("moneyball_logo.png", 200), width=200)
 
 # Set background image using base64
-def set_background(image_file):
-    with open(image_file, "rb") as img:
-        encoded = base64.b64encode(img.read()).decode()
-    css = f'''
-    <style>
-    .stApp {{
-        background-image: url("data:image/png;base64,{encoded}");
-        background-size: cover;
-        background-repeat: no-repeat;
-        background-attachment: fixed;
-    }}
-    </style>
-    '''
-    st.markdown(css, unsafe_allow_html=True)
-
 set_background("baseball_diamond_bg.png")
 
 st.title("Moneyball Phil: Daily Hit Probability Simulator")
@@ -1,25 +1,13 @@
 
 import streamlit as st
 import math
-import base64
+
+from moneyball_assets import image_variant, set_background
+from moneyball_core import get_zone
+from moneyball_odds import american_to_implied
 
 # Set up custom background image
-def set_background():
-    with open("baseball_diamond_bg.png", "rb") as image_file:
-        encoded = base64.b64encode(image_file.read()).decode()
-    bg_css = f"""
-    <style>
-    .stApp {{
-        background-image: url("data:image/png;base64,{encoded}");
-        background-size: cover;
-        background-position: center;
-        background-attachment: fixed;
-    }}
-    </style>
-    """
-    st.markdown(bg_css, unsafe_allow_html=True)
-
-set_background()
+set_background("baseball_diamond_bg.png")
 
 # --- Helper Functions ---
 def calculate_weighted_avg(season, last7, split, pitcher_avg=None, pitcher_ab=0):
@@ -39,30 +27,14 @@ def calculate_weighted_avg(season, last7, split, pitcher_avg=None, pitcher_ab=0)
 def binomial_hit_probability(avg, ab=4):
     return 1 - (1 - avg) ** ab
 
-def american_to_implied(odds):
-    if odds < 0:
-        return abs(odds) / (abs(odds) + 100)
-    else:
-        return 100 / (odds + 100)
-
 def calculate_parlay_probability(*probs):
     result = 1
     for p in probs:
         result *= p
     return result
 
-def get_zone(prob):
-    if prob > 0.8:
-        return "Elite"
-    elif prob > 0.7:
-        return "Strong"
-    elif prob > 0.6:
-        return "Moderate"
-    else:
-        return "Bad"
-
 # --- UI Setup ---
-st.image("moneyball_logo.png", width=160)
+st.image(image_variant("moneyball_logo.png", 160), width=160)
 st.title("💰 Moneyball Phil: Daily Hit Probability Simulator")
 
 if 'players' not in st.session_state:
@@ -2,43 +2,24 @@ import streamlit as st
 import math
 import pandas as pd
 
-# --- Helper Functions ---
-def calculate_weighted_avg(season, last7, split, hand_avg=None, pitcher_avg=None, pitcher_ab=0):
-    pitcher_weight = 0.3 if pitcher_ab >= 7 else 0.1 if pitcher_ab > 0 else 0
-    hand_weight = 0.2
-    season_weight = 0.4
-    recent_weight = 0.3
-    split_weight = 0.3
-
-    total_weight = season_weight + recent_weight + split_weight + pitcher_weight + hand_weight
-    weighted_sum = (
-        season * season_weight +
-        last7 * recent_weight +
-        split * split_weight +
-        (pitcher_avg * pitcher_weight if pitcher_avg is not None else 0) +
-        (hand_avg * hand_weight if hand_avg is not None else 0)
-    )
-    return weighted_sum / total_weight
-
-def binomial_hit_probability(avg, ab):
-    prob_no_hit = (1 - avg) ** ab
-    return 1 - prob_no_hit
-
-def american_to_implied(odds):
-    if odds < 0:
-        return abs(odds) / (abs(odds) + 100)
-    else:
-        return 100 / (odds + 100)
-
-def calculate_parlay_probability(p1, p2):
-    return p1 * p2
+from moneyball_assets import image_variant
+from moneyball_board import BOARD_FORMATS, RANKINGS, HitBoard
+from moneyball_core import binomial_hit_probability, calculate_weighted_avg
+from moneyball_lineup_import import read_slate, slate_to_players
+from moneyball_devig import fair_implied_two_way
+from moneyball_game_sim import player_hit_probability_ci
+from moneyball_odds import american_to_implied, implied_to_american
+from moneyball_parlays import MAX_LEGS, MIN_LEGS, Parlay
+from moneyball_sgp import price_parlays
 
 # --- Session State ---
 if 'players' not in st.session_state:
-    st.session_state.players = []
+    st.session_state.players = HitBoard()
+if 'parlay' not in st.session_state:
+    st.session_state.parlay = Parlay()
 
 # --- Title ---
-st.image("moneyball_logo.png", width=160)
+st.image(image_variant("moneyball_logo.png", 160), width=160)
 st.title("💰 Moneyball Phil: Daily Hit Probability Simulator")
 
 # --- Batting Order AB Averages ---
@@ -59,6 +40,8 @@ with st.form("player_input_form"):
     pitcher_ab = st.number_input("At-Bats vs Pitcher", min_value=0, step=1)
     batting_order = st.selectbox("Batting Order Position (1–9)", list(range(1, 10)))
     odds = st.number_input("Sportsbook Odds (American)", step=1)
+    under_odds = st.number_input("Under Odds (American, 0 if not posted)", step=1)
+    team = st.text_input("Team (optional, for same-game parlay pricing)")
 
     expected_ABs = batting_order_ab_lookup[batting_order]
     weighted_avg = calculate_weighted_avg(season_avg, last7_avg, split_avg, hand_avg, pitcher_avg, pitcher_ab)
@@ -72,6 +55,7 @@ with st.form("player_input_form"):
         implied_prob = american_to_implied(odds)
         ev = (true_hit_prob - implied_prob) * 100
         zone = "Elite" if true_hit_prob > 0.8 else "Strong" if true_hit_prob > 0.7 else "Moderate" if true_hit_prob > 0.6 else "Bad"
+        fair_prob = fair_implied_two_way(odds, under_odds or None)
 
         st.session_state.players.append({
             "name": f"{name} (Batting #{batting_order}) vs {handedness}",
@@ -79,58 +63,108 @@ with st.form("player_input_form"):
             "zone": zone,
             "ev": round(ev, 1),
             "odds": odds,
-            "implied": round(implied_prob * 100, 1)
+            "implied": round(implied_prob * 100, 1),
+            "fair_implied": round(fair_prob * 100, 1),
+            "fair_ev": round((true_hit_prob - fair_prob) * 100, 1),
+            "avg": weighted_avg,
+            "batting_order": batting_order,
+            "team": team.strip() or None
         })
 
+# --- Bulk Slate Import ---
+st.header("📂 Bulk Slate Import")
+st.caption("Upload a CSV or Parquet slate with columns: name, season_avg, last7_avg, split_avg, batting_order, odds "
+           "(optional: handedness, hand_avg, pitcher_avg, pitcher_ab, under_odds, team, game).")
+slate_file = st.file_uploader("Slate File", type=["csv", "parquet"])
+if slate_file is not None and st.button("Add Slate to Board"):
+    try:
+        new_players = slate_to_players(read_slate(slate_file))
+    except ValueError as e:
+        st.error(f"Slate not imported: {e}")
+    else:
+        st.session_state.players.extend(new_players)
+        st.success(f"Added {len(new_players)} players to the Top Hit Board.")
+
 # --- Top Hit Board ---
+@st.cache_resource
+def _simulated_hit_memo():
+    return {}  # (avg, slot) -> (prob, ci), shared by every session
+
+
+def simulated_hit_ci(avgs, slots):
+    # Only players not simulated before run, so one new player costs one simulation.
+    memo = _simulated_hit_memo()
+    missing = [key for key in zip(avgs, slots) if key not in memo]
+    if missing:
+        with st.spinner(f"Running game simulations for {len(missing)} players..."):
+            probs, cis = player_hit_probability_ci([avg for avg, _ in missing], [slot for _, slot in missing],
+                                                   half_width=0.0025, method="antithetic", seed=0)
+        memo.update(zip(missing, zip(probs.tolist(), cis.tolist())))
+    return {key: memo[key] for key in zip(avgs, slots)}
+
+
 st.header("🔥 Top Hit Board")
 if not st.session_state.players:
     st.info("No players simulated yet.")
 else:
-    df = pd.DataFrame([
-        {
-            "Rank": i+1,
-            "Player": p["name"],
-            "True Hit Probability": f"{p['prob']}%",
-            "Implied Probability": f"{p['implied']}%",
-            "EV%": f"{p['ev']}%",
-            "Zone": p["zone"]
-        } for i, p in enumerate(sorted(st.session_state.players, key=lambda x: x['prob'], reverse=True))
-    ])
-    st.dataframe(df, use_container_width=True)
+    board = st.session_state.players
+    rank_by = st.selectbox("Rank by", list(RANKINGS), key="rank_by")
+    top_n = st.number_input("Players shown (0 = all)", min_value=0, step=10, key="board_top")
+    show_ci = st.checkbox("Show game-simulation hit probability with 95% CI (±0.25 pts)", key="show_ci")
+    use_fair = st.checkbox("Use de-vigged (fair) odds for Implied Probability and EV", key="use_fair")
+    st.dataframe(board.table(use_fair=use_fair, sim=simulated_hit_ci if show_ci else None, by=RANKINGS[rank_by],
+                             top=top_n or None),
+                 use_container_width=True,
+                 column_config={column: st.column_config.NumberColumn(format=fmt) for column, fmt in BOARD_FORMATS.items()})
 
 
 # --- Parlay Builder ---
+@st.cache_data
+def correlated_parlay(probs, teams, games):
+    # Reruns with the same legs (e.g. editing the parlay odds) skip the 200k-sim copula.
+    return price_parlays(probs, [list(range(len(probs)))], teams=teams, games=games, seed=0)
+
+
 st.header("🧮 Parlay Builder")
-st.caption("Select 2 players from the Top Hit Board to calculate parlay EV vs sportsbook odds.")
+st.caption("Select 2 or more players from the Top Hit Board to calculate parlay EV vs sportsbook odds.")
 
 if len(st.session_state.players) >= 2:
-    names = [p["name"] for p in st.session_state.players]
-    p1_name = st.selectbox("Select Player 1", names, key="p1")
-    p2_name = st.selectbox("Select Player 2", names, key="p2")
-    parlay_odds = st.number_input("Enter Parlay Odds (American)", step=1, key="parlay_odds")
+    board = st.session_state.players
+    selected_players = st.multiselect("Select Players (2 or more)", board.ids(), format_func=board.label, key="parlay_legs")
 
-    if p1_name != p2_name:
-        player1 = next(p for p in st.session_state.players if p['name'] == p1_name)
-        player2 = next(p for p in st.session_state.players if p['name'] == p2_name)
+    if len(selected_players) >= 2:
+        parlay_odds = st.number_input("Enter Parlay Odds (American)", step=1, key="parlay_odds")
 
-        p1_prob = player1['prob'] / 100
-        p2_prob = player2['prob'] / 100
-
-        true_parlay_prob = calculate_parlay_probability(p1_prob, p2_prob)
+        parlay = st.session_state.parlay
+        parlay.sync(selected_players, board.leg, version=board.version)
+        true_parlay_prob = parlay.prob
         implied_parlay_prob = american_to_implied(parlay_odds)
-        ev_parlay = (true_parlay_prob - implied_parlay_prob) * 100
+        ev_parlay = parlay.ev(implied_parlay_prob)
 
         st.markdown(f"**True Parlay Probability:** {round(true_parlay_prob * 100, 1)}%")
         st.markdown(f"**Implied Probability:** {round(implied_parlay_prob * 100, 1)}%")
         st.markdown(f"**Expected Value (EV%):** {round(ev_parlay, 1)}%")
+        if parlay.decimal_odds is not None:
+            st.markdown(f"**Priced from Leg Odds:** {parlay.decimal_odds:.2f} decimal, EV% {round(parlay.ev(), 1)}%")
 
         if ev_parlay > 0:
             st.success("✅ This is a +EV Parlay!")
         else:
             st.error("❌ Negative EV Parlay")
+
+        st.dataframe(board.parlay_table(parlay), use_container_width=True,
+                     column_config={column: st.column_config.NumberColumn(format=fmt) for column, fmt in BOARD_FORMATS.items()})
+
+        legs = [board.player(player_id) for player_id in selected_players]
+        if all(p.get("team") for p in legs):
+            sgp = correlated_parlay(tuple(p["prob"] / 100 for p in legs), tuple(p["team"] for p in legs),
+                                    tuple(p.get("game") or p["team"] for p in legs))
+            correlated_prob = sgp["correlated"][0]
+            st.markdown(f"**Correlated Parlay Probability:** {round(correlated_prob * 100, 1)}% "
+                        f"({sgp['delta'][0] * 100:+.1f} pts vs independent)")
+            st.markdown(f"**Correlated EV%:** {round((correlated_prob - implied_parlay_prob) * 100, 1)}%")
     else:
-        st.warning("Please select two different players.")
+        st.warning("Please select at least 2 different players.")
 else:
     st.info("Add at least 2 players to use the Parlay Builder.")
 
@@ -139,30 +173,32 @@ else:
 st.header("🤖 Recommended Parlays from Hit Board")
 
 if len(st.session_state.players) >= 2:
-    show_recos = st.button("Suggest Top 2-Leg Parlays")
+    max_legs = min(MAX_LEGS, len(st.session_state.players))
+    num_legs = st.selectbox("Legs per Parlay", list(range(MIN_LEGS, max_legs + 1)), key="recommend_legs")
+    show_recos = st.button("Suggest Top Parlays")
 
     if show_recos:
-        assumed_odds = st.number_input("Enter sportsbook parlay odds (American)", value=140, step=1, key="recommend_odds")
-        implied_prob = american_to_implied(assumed_odds)
-
-        combos = []
-        for i in range(len(st.session_state.players)):
-            for j in range(i + 1, len(st.session_state.players)):
-                p1 = st.session_state.players[i]
-                p2 = st.session_state.players[j]
-                true_parlay_prob = (p1["prob"] / 100) * (p2["prob"] / 100)
-                ev = (true_parlay_prob - implied_prob) * 100
-                combos.append({
-                    "Players": f"{p1['name']} + {p2['name']}",
-                    "True Probability": round(true_parlay_prob * 100, 1),
-                    "Implied Probability": round(implied_prob * 100, 1),
-                    "EV%": round(ev, 1),
-                    "Odds": f"+{assumed_odds}" if assumed_odds > 0 else f"{assumed_odds}"
-                })
-
-        top_recos = sorted(combos, key=lambda x: x["EV%"], reverse=True)[:3]
-
-        st.subheader("Top 2-Leg Parlay Suggestions")
-        st.table(top_recos)
+        board = st.session_state.players
+        best = board.priced_parlays(num_legs, top_n=3)
+        top_recos = [
+            {
+                "Players": " + ".join(map(board.label, parlay["legs"])),
+                "True Probability": round(parlay["prob"] * 100, 1),
+                "Implied Probability": round(parlay["implied"] * 100, 1),
+                "ROI%": round(parlay["roi"], 1),
+                "Edge (pts)": round(parlay["edge"], 1),
+                "Odds": f"{implied_to_american(parlay['implied']):+.0f}" if parlay["implied"] < 1 else "n/a",
+                "Fair Odds": f"{implied_to_american(parlay['prob']):+.0f}" if 0 < parlay["prob"] < 1 else "n/a"
+            } for parlay in best
+        ]
+
+        if top_recos:
+            st.subheader(f"Top {num_legs}-Leg Parlay Suggestions")
+            st.caption("Each parlay is priced from its legs' sportsbook odds and ranked by ROI% "
+                       "(expected profit per 100 staked); Edge is true minus implied probability, "
+                       "the same measure as EV% elsewhere on the page.")
+            st.table(top_recos)
+        else:
+            st.warning(f"Need at least {num_legs} players with posted odds to price {num_legs}-leg parlays.")
 else:
     st.info("Analyze at least 2 players to generate parlay recommendations.")
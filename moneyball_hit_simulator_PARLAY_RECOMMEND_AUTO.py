@@ -2,43 +2,20 @@ import streamlit as st
 import math
 import pandas as pd
 
-# --- Helper Functions ---
-def calculate_weighted_avg(season, last7, split, hand_avg=None, pitcher_avg=None, pitcher_ab=0):
-    pitcher_weight = 0.3 if pitcher_ab >= 7 else 0.1 if pitcher_ab > 0 else 0
-    hand_weight = 0.2
-    season_weight = 0.4
-    recent_weight = 0.3
-    split_weight = 0.3
-
-    total_weight = season_weight + recent_weight + split_weight + pitcher_weight + hand_weight
-    weighted_sum = (
-        season * season_weight +
-        last7 * recent_weight +
-        split * split_weight +
-        (pitcher_avg * pitcher_weight if pitcher_avg is not None else 0) +
-        (hand_avg * hand_weight if hand_avg is not None else 0)
-    )
-    return weighted_sum / total_weight
-
-def binomial_hit_probability(avg, ab):
-    prob_no_hit = (1 - avg) ** ab
-    return 1 - prob_no_hit
-
-def american_to_implied(odds):
-    if odds < 0:
-        return abs(odds) / (abs(odds) + 100)
-    else:
-        return 100 / (odds + 100)
-
-def calculate_parlay_probability(p1, p2):
-    return p1 * p2
+from moneyball_assets import image_variant
+from moneyball_board import BOARD_FORMATS, RANKINGS, HitBoard
+from moneyball_core import binomial_hit_probability, calculate_weighted_avg
+from moneyball_odds import american_to_implied
+from moneyball_parlays import MAX_LEGS, MIN_LEGS, Parlay, top_parlays
 
 # --- Session State ---
 if 'players' not in st.session_state:
-    st.session_state.players = []
+    st.session_state.players = HitBoard()
+if 'parlay' not in st.session_state:
+    st.session_state.parlay = Parlay()
 
 # --- Title ---
-st.image("moneyball_logo.png", width=160)
+st.image(image_variant("moneyball_logo.png", 160), width=160)
 st.title("💰 Moneyball Phil: Daily Hit Probability Simulator")
 
 # --- Batting Order AB Averages ---
@@ -87,50 +64,44 @@ st.header("🔥 Top Hit Board")
 if not st.session_state.players:
     st.info("No players simulated yet.")
 else:
-    df = pd.DataFrame([
-        {
-            "Rank": i+1,
-            "Player": p["name"],
-            "True Hit Probability": f"{p['prob']}%",
-            "Implied Probability": f"{p['implied']}%",
-            "EV%": f"{p['ev']}%",
-            "Zone": p["zone"]
-        } for i, p in enumerate(sorted(st.session_state.players, key=lambda x: x['prob'], reverse=True))
-    ])
-    st.dataframe(df, use_container_width=True)
+    rank_by = st.selectbox("Rank by", list(RANKINGS), key="rank_by")
+    top_n = st.number_input("Players shown (0 = all)", min_value=0, step=10, key="board_top")
+    st.dataframe(st.session_state.players.table(by=RANKINGS[rank_by], top=top_n or None), use_container_width=True,
+                 column_config={column: st.column_config.NumberColumn(format=fmt) for column, fmt in BOARD_FORMATS.items()})
 
 
 # --- Parlay Builder ---
 st.header("🧮 Parlay Builder")
-st.caption("Select 2 players from the Top Hit Board to calculate parlay EV vs sportsbook odds.")
+st.caption("Select 2 or more players from the Top Hit Board to calculate parlay EV vs sportsbook odds.")
 
 if len(st.session_state.players) >= 2:
-    names = [p["name"] for p in st.session_state.players]
-    p1_name = st.selectbox("Select Player 1", names, key="p1")
-    p2_name = st.selectbox("Select Player 2", names, key="p2")
-    parlay_odds = st.number_input("Enter Parlay Odds (American)", step=1, key="parlay_odds")
+    board = st.session_state.players
+    selected_players = st.multiselect("Select Players (2 or more)", board.ids(), format_func=board.label, key="parlay_legs")
 
-    if p1_name != p2_name:
-        player1 = next(p for p in st.session_state.players if p['name'] == p1_name)
-        player2 = next(p for p in st.session_state.players if p['name'] == p2_name)
+    if len(selected_players) >= 2:
+        parlay_odds = st.number_input("Enter Parlay Odds (American)", step=1, key="parlay_odds")
 
-        p1_prob = player1['prob'] / 100
-        p2_prob = player2['prob'] / 100
-
-        true_parlay_prob = calculate_parlay_probability(p1_prob, p2_prob)
+        parlay = st.session_state.parlay
+        parlay.sync(selected_players, board.leg, version=board.version)
+        true_parlay_prob = parlay.prob
         implied_parlay_prob = american_to_implied(parlay_odds)
-        ev_parlay = (true_parlay_prob - implied_parlay_prob) * 100
+        ev_parlay = parlay.ev(implied_parlay_prob)
 
         st.markdown(f"**True Parlay Probability:** {round(true_parlay_prob * 100, 1)}%")
         st.markdown(f"**Implied Probability:** {round(implied_parlay_prob * 100, 1)}%")
         st.markdown(f"**Expected Value (EV%):** {round(ev_parlay, 1)}%")
+        if parlay.decimal_odds is not None:
+            st.markdown(f"**Priced from Leg Odds:** {parlay.decimal_odds:.2f} decimal, EV% {round(parlay.ev(), 1)}%")
 
         if ev_parlay > 0:
             st.success("✅ This is a +EV Parlay!")
         else:
             st.error("❌ Negative EV Parlay")
+
+        st.dataframe(board.parlay_table(parlay), use_container_width=True,
+                     column_config={column: st.column_config.NumberColumn(format=fmt) for column, fmt in BOARD_FORMATS.items()})
     else:
-        st.warning("Please select two different players.")
+        st.warning("Please select at least 2 different players.")
 else:
     st.info("Add at least 2 players to use the Parlay Builder.")
 
@@ -139,23 +110,21 @@ else:
 st.header("🤖 Recommended Parlays from Hit Board")
 
 if len(st.session_state.players) >= 2:
-    show_recos = st.button("Suggest Top 2-Leg Parlays")
+    max_legs = min(MAX_LEGS, len(st.session_state.players))
+    num_legs = st.selectbox("Legs per Parlay", list(range(MIN_LEGS, max_legs + 1)), key="recommend_legs")
+    show_recos = st.button("Suggest Top Parlays")
 
     if show_recos:
-        combos = []
-        for i in range(len(st.session_state.players)):
-            for j in range(i + 1, len(st.session_state.players)):
-                p1 = st.session_state.players[i]
-                p2 = st.session_state.players[j]
-                true_parlay_prob = (p1["prob"] / 100) * (p2["prob"] / 100)
-                combos.append({
-                    "Players": f"{p1['name']} + {p2['name']}",
-                    "True Parlay Probability": round(true_parlay_prob * 100, 1)
-                })
-
-        top_recos = sorted(combos, key=lambda x: x["True Parlay Probability"], reverse=True)[:3]
-
-        st.subheader("Top 2-Leg Parlay Suggestions (Sorted by True Probability)")
+        players = st.session_state.players.frame()
+        best = top_parlays((players["prob"] / 100).tolist(), num_legs, top_n=3)
+        top_recos = [
+            {
+                "Players": " + ".join(map(st.session_state.players.label, players["id"].iloc[list(parlay["legs"])])),
+                "True Parlay Probability": round(parlay["prob"] * 100, 1)
+            } for parlay in best
+        ]
+
+        st.subheader(f"Top {num_legs}-Leg Parlay Suggestions (Sorted by True Probability)")
         st.table(top_recos)
 else:
     st.info("Analyze at least 2 players to generate parlay recommendations.")
@@ -0,0 +1,149 @@
+"""Bulk lineup import for the Top Hit Board.
+
+Reads a whole slate from CSV or Parquet, validates it column by column and
+scores it through ``moneyball_scoring.score_slate`` so every batter lands on
+the board in a single rerun instead of one form submit per player.
+"""
+import numpy as np
+import pandas as pd
+
+from moneyball_devig import fair_implied_two_way
+from moneyball_scoring import score_slate
+
+REQUIRED_COLUMNS = ["name", "season_avg", "last7_avg", "split_avg", "batting_order", "odds"]
+OPTIONAL_COLUMNS = {
+    "handedness": "RHP", "hand_avg": None, "pitcher_avg": None, "pitcher_ab": 0, "under_odds": None,
+    "team": None, "game": None,
+}
+AVG_COLUMNS = ["season_avg", "last7_avg", "split_avg", "hand_avg", "pitcher_avg"]
+HANDEDNESS = ("RHP", "LHP")
+
+
+def read_slate(file, filename=None):
+    """Load an uploaded slate file (path or file-like) into a DataFrame."""
+    filename = (filename or getattr(file, "name", None) or str(file)).lower()
+    if filename.endswith(".parquet"):
+        return pd.read_parquet(file)
+    return pd.read_csv(file)
+
+
+def _bad_rows(mask):
+    # Report 1-based row numbers the way they appear in a spreadsheet.
+    rows = (np.flatnonzero(mask) + 1).tolist()
+    shown = ", ".join(map(str, rows[:10]))
+    return shown + (f" (+{len(rows) - 10} more)" if len(rows) > 10 else "")
+
+
+def validate_slate(df):
+    """Return a cleaned copy of ``df`` or raise ValueError listing every problem."""
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    df = df.copy()
+    for column, default in OPTIONAL_COLUMNS.items():
+        if column not in df.columns:
+            df[column] = default
+
+    errors = []
+    df["name"] = df["name"].astype("string").str.strip()
+    blank = df["name"].isna() | (df["name"] == "")
+    if blank.any():
+        errors.append(f"name is blank on rows {_bad_rows(blank)}")
+
+    for column in AVG_COLUMNS:
+        values = pd.to_numeric(df[column], errors="coerce")
+        required = column in REQUIRED_COLUMNS
+        bad = (values.isna() & (df[column].notna() | required)) | (values < 0) | (values > 1)
+        if bad.any():
+            errors.append(f"{column} must be between 0 and 1 on rows {_bad_rows(bad)}")
+        df[column] = values
+
+    order = pd.to_numeric(df["batting_order"], errors="coerce")
+    bad = ~order.isin(range(1, 10))
+    if bad.any():
+        errors.append(f"batting_order must be 1-9 on rows {_bad_rows(bad)}")
+    df["batting_order"] = order
+
+    pitcher_ab = pd.to_numeric(df["pitcher_ab"].fillna(0), errors="coerce")
+    bad = pitcher_ab.isna() | (pitcher_ab < 0) | (pitcher_ab % 1 != 0)
+    if bad.any():
+        errors.append(f"pitcher_ab must be a whole number >= 0 on rows {_bad_rows(bad)}")
+    df["pitcher_ab"] = pitcher_ab
+
+    # Books post whole-number prices; a fractional one would be truncated below.
+    odds = pd.to_numeric(df["odds"], errors="coerce")
+    bad = odds.isna() | (odds % 1 != 0)
+    if bad.any():
+        errors.append(f"odds must be whole American odds on rows {_bad_rows(bad)}")
+    df["odds"] = odds
+
+    under_odds = pd.to_numeric(df["under_odds"], errors="coerce")
+    bad = df["under_odds"].notna() & (under_odds.isna() | (under_odds % 1 != 0))
+    if bad.any():
+        errors.append(f"under_odds must be whole American odds on rows {_bad_rows(bad)}")
+    # 0 means "not posted", as in the input form.
+    df["under_odds"] = under_odds.mask(under_odds == 0)
+
+    df["handedness"] = df["handedness"].fillna("RHP").astype("string").str.strip().str.upper()
+    bad = ~df["handedness"].isin(HANDEDNESS)
+    if bad.any():
+        errors.append(f"handedness must be RHP or LHP on rows {_bad_rows(bad)}")
+
+    if errors:
+        raise ValueError("; ".join(errors))
+    df["batting_order"] = df["batting_order"].astype(int)
+    df["pitcher_ab"] = df["pitcher_ab"].astype(int)
+    df["odds"] = df["odds"].astype(int)
+    return df.reset_index(drop=True)
+
+
+def _labels(column):
+    return [None if pd.isna(v) or not str(v).strip() else str(v).strip() for v in column]
+
+
+def slate_to_players(df):
+    """Validate and score a slate, returning Top Hit Board player dicts."""
+    df = validate_slate(df)
+    scored = score_slate(
+        df["season_avg"].to_numpy(),
+        df["last7_avg"].to_numpy(),
+        df["split_avg"].to_numpy(),
+        df["hand_avg"].to_numpy(),
+        df["pitcher_avg"].to_numpy(),
+        df["pitcher_ab"].to_numpy(),
+        df["batting_order"].to_numpy(),
+        df["odds"].to_numpy(),
+    )
+    fair = fair_implied_two_way(df["odds"].to_numpy(), df["under_odds"].to_numpy())
+    return [
+        {
+            "name": f"{name} (Batting #{order}) vs {hand}",
+            "prob": round(prob * 100, 1),
+            "zone": zone,
+            "ev": round(ev, 1),
+            "odds": odds,
+            "implied": round(implied * 100, 1),
+            "fair_implied": round(fair_prob * 100, 1),
+            "fair_ev": round((prob - fair_prob) * 100, 1),
+            "avg": avg,
+            "batting_order": order,
+            "team": team,
+            "game": game,
+        }
+        for name, order, hand, prob, zone, ev, odds, implied, fair_prob, avg, team, game in zip(
+            df["name"].tolist(),
+            df["batting_order"].tolist(),
+            df["handedness"].tolist(),
+            scored["prob"].tolist(),
+            scored["zone"].tolist(),
+            scored["ev"].tolist(),
+            df["odds"].tolist(),
+            scored["implied"].tolist(),
+            fair.tolist(),
+            scored["weighted_avg"].tolist(),
+            _labels(df["team"]),
+            _labels(df["game"]),
+        )
+    ]
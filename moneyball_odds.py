@@ -0,0 +1,167 @@
+"""Precomputed American odds conversions.
+
+Books post integer American odds, so every price between ``ODDS_MIN`` and
+``ODDS_MAX`` is converted once at import and array conversions are a
+single ``take`` from that table; prices outside the table or with a
+fractional part fall back to the closed form. A plain Python number skips
+the table: one branch and a division beat any lookup's call overhead on
+the per-submit path.
+
+The inverse direction turns a probability into its fair (no-vig) American
+or decimal price.
+"""
+import numbers
+
+ODDS_MIN = -10000
+ODDS_MAX = 10000
+
+
+def _implied(odds):
+    return abs(odds) / (abs(odds) + 100) if odds < 0 else 100 / (odds + 100)
+
+
+# Built in pure Python so importing this module (and scoring one player)
+# does not pull in NumPy; the array copies are made on first array call.
+_IMPLIED_LIST = [_implied(odds) for odds in range(ODDS_MIN, ODDS_MAX + 1)]
+_DECIMAL_LIST = [1 / p for p in _IMPLIED_LIST]
+_arrays = {}
+
+
+def _table(name):
+    if name not in _arrays:
+        import numpy as np
+
+        _arrays["IMPLIED_TABLE"] = np.array(_IMPLIED_LIST)
+        _arrays["DECIMAL_TABLE"] = np.array(_DECIMAL_LIST)
+    return _arrays[name]
+
+
+def __getattr__(name):
+    if name in ("IMPLIED_TABLE", "DECIMAL_TABLE"):
+        return _table(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _implied_formula(odds):
+    import numpy as np
+
+    odds = np.asarray(odds, dtype=float)
+    abs_odds = np.abs(odds)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds < 0, abs_odds / (abs_odds + 100), 100 / (odds + 100))
+
+
+def _lookup(odds, name, table_list, formula):
+    if type(odds) is int and ODDS_MIN <= odds <= ODDS_MAX:
+        return table_list[odds - ODDS_MIN]  # the common case: one list index
+    if isinstance(odds, numbers.Real):
+        if odds == odds and ODDS_MIN <= odds <= ODDS_MAX and int(odds) == odds:
+            return table_list[int(odds) - ODDS_MIN]
+        return float(formula(odds))
+
+    import numpy as np
+
+    table = _table(name)
+    odds = np.asarray(odds)
+    if odds.ndim == 0:
+        return _lookup(odds.item(), name, table_list, formula)
+    if odds.dtype.kind in "iu" and (odds.size == 0 or (odds.min() >= ODDS_MIN and odds.max() <= ODDS_MAX)):
+        return table.take(odds - ODDS_MIN)
+    odds = odds.astype(float)
+    index = np.clip(np.nan_to_num(odds), ODDS_MIN, ODDS_MAX).astype(np.intp)
+    in_table = index == odds
+    if in_table.all():
+        return table.take(index - ODDS_MIN)
+    return np.where(in_table, table.take(index - ODDS_MIN), formula(odds))
+
+
+def _decimal_formula(odds):
+    import numpy as np
+
+    with np.errstate(divide="ignore"):
+        return 1 / _implied_formula(odds)
+
+
+def american_to_implied(odds):
+    """Implied probability (0-1) of American odds, scalar or array."""
+    if type(odds) is int or type(odds) is float:
+        return -odds / (100 - odds) if odds < 0 else 100 / (odds + 100)
+    return _lookup(odds, "IMPLIED_TABLE", _IMPLIED_LIST, _implied_formula)
+
+
+def american_to_decimal(odds):
+    """Decimal odds (total return per unit staked) of American odds."""
+    if type(odds) is int or type(odds) is float:
+        return 1 / (-odds / (100 - odds) if odds < 0 else 100 / (odds + 100))
+    return _lookup(odds, "DECIMAL_TABLE", _DECIMAL_LIST, _decimal_formula)
+
+
+def implied_to_american(prob):
+    """Fair American odds for a probability (0-1), scalar or array.
+
+    Favourites (p >= 0.5) get negative odds. Not rounded, since a fair
+    price is usually compared against the posted one rather than shown.
+    """
+    if isinstance(prob, numbers.Real):
+        if not 0 < prob < 1:
+            raise ValueError("prob must be between 0 and 1 (exclusive)")
+        return -100 * prob / (1 - prob) if prob >= 0.5 else 100 * (1 - prob) / prob
+
+    import numpy as np
+
+    prob = np.asarray(prob, dtype=float)
+    if ((prob <= 0) | (prob >= 1)).any():
+        raise ValueError("prob must be between 0 and 1 (exclusive)")
+    return np.where(prob >= 0.5, -100 * prob / (1 - prob), 100 * (1 - prob) / prob)
+
+
+def implied_to_decimal(prob):
+    """Fair decimal odds for a probability (0-1), scalar or array."""
+    if isinstance(prob, numbers.Real):
+        if not 0 < prob <= 1:
+            raise ValueError("prob must be in (0, 1]")
+        return 1 / prob
+
+    import numpy as np
+
+    prob = np.asarray(prob, dtype=float)
+    if ((prob <= 0) | (prob > 1)).any():
+        raise ValueError("prob must be in (0, 1]")
+    return 1 / prob
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    import numpy as np
+
+    def branching(odds):
+        if odds < 0:
+            return abs(odds) / (abs(odds) + 100)
+        else:
+            return 100 / (odds + 100)
+
+    rng = random.Random(0)
+    prices = [rng.choice([-1, 1]) * rng.randint(100, 2000) for _ in range(1_000_000)]
+    assert all(branching(o) == american_to_implied(o) for o in prices[:10_000])
+
+    start = time.perf_counter()
+    for o in prices:
+        branching(o)
+    formula_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for o in prices:
+        american_to_implied(o)
+    table_s = time.perf_counter() - start
+    print(f"scalar, {len(prices)} prices: branching function {formula_s:.2f} s, american_to_implied {table_s:.2f} s")
+
+    board = np.array(prices)
+    start = time.perf_counter()
+    expected = _implied_formula(board)
+    formula_s = time.perf_counter() - start
+    start = time.perf_counter()
+    looked_up = american_to_implied(board)
+    table_s = time.perf_counter() - start
+    assert np.array_equal(expected, looked_up)
+    print(f"array, {len(prices)} prices: formula {formula_s * 1000:.1f} ms, table {table_s * 1000:.1f} ms")
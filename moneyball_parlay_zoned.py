@@ -2,6 +2,9 @@
 import streamlit as st
 import math
 
+from moneyball_assets import image_variant
+from moneyball_parlays import Parlay
+
 st.set_page_config(layout="wide")
 
 # Custom Background and Logo
@@ -17,22 +20,21 @@ background-attachment: fixed;
 </style>
 '''
 st.markdown(page_bg_img, unsafe_allow_html=True)
-st.image("moneyball_logo.png", width=150)
+st.image(image_variant("moneyball_logo.png", 150), width=150)
 
 st.title("Moneyball Phil: Daily Hit Probability Simulator")
 
 # Parlay Builder Inputs
 st.subheader("🔗 Parlay Builder")
-leg1_prob = st.number_input("True Hit Probability for Leg 1 (%)", min_value=0.0, max_value=100.0, step=0.1) / 100
-leg2_prob = st.number_input("True Hit Probability for Leg 2 (%)", min_value=0.0, max_value=100.0, step=0.1) / 100
-leg3_prob = st.number_input("True Hit Probability for Leg 3 (%) [Optional]", min_value=0.0, max_value=100.0, step=0.1) / 100
+num_legs = st.number_input("Number of Legs", min_value=2, value=2, step=1)
+parlay = Parlay(
+    (leg, st.number_input(f"True Hit Probability for Leg {leg} (%)", min_value=0.0, max_value=100.0, step=0.1) / 100, None)
+    for leg in range(1, num_legs + 1)
+)
 parlay_odds = st.number_input("Sportsbook Parlay Odds (e.g. +150)", step=1)
 
 if st.button("Calculate Parlay Value"):
-    if leg3_prob > 0:
-        true_parlay_prob = leg1_prob * leg2_prob * leg3_prob
-    else:
-        true_parlay_prob = leg1_prob * leg2_prob
+    true_parlay_prob = parlay.prob
 
     implied_prob = abs(parlay_odds) / (abs(parlay_odds) + 100) if parlay_odds > 0 else 100 / (100 + abs(parlay_odds))
     ev = (true_parlay_prob * (100 if parlay_odds < 0 else parlay_odds)) - (1 - true_parlay_prob) * 100
@@ -0,0 +1,284 @@
+"""Top-K parlay search over the Top Hit Board.
+
+Finds the best k-leg parlays (2-6 legs) without building every C(n, k)
+combination: legs are visited in descending order of probability, a
+bounded heap keeps the current top N, and any branch whose best possible
+product cannot beat the worst kept parlay is cut off.
+
+``top_priced_parlays`` ranks parlays by expected return when every leg
+is paid at its own odds (the payout is the product of the legs' decimal
+odds). A top-N k-leg parlay can only use the N + k - 1 legs with the
+best p x decimal, since otherwise swapping a leg for a better unused one
+gives N parlays that beat it. So every candidate combination of that
+small pool is priced in one vectorized pass, whatever the board size.
+
+``Parlay`` is the Parlay Builder's slip: any number of legs, kept as
+running sums of log-probabilities and log decimal odds so adding or
+removing a leg is O(1) and long slips do not underflow, with each leg's
+share of the EV reported alongside.
+"""
+import heapq
+import itertools
+import math
+
+import numpy as np
+
+from moneyball_odds import american_to_decimal
+
+MIN_LEGS = 2
+MAX_LEGS = 6
+
+
+def top_k_products(values, legs, top_n=3):
+    """Return the ``top_n`` index combinations with the largest product.
+
+    ``values`` must be non-negative. Results are ``(indices, product)``
+    pairs, best first, with indices referring to positions in ``values``.
+    """
+    if not MIN_LEGS <= legs <= MAX_LEGS:
+        raise ValueError(f"legs must be between {MIN_LEGS} and {MAX_LEGS}")
+    n = len(values)
+    if legs > n or top_n <= 0:
+        return []
+
+    order = sorted(range(n), key=lambda i: values[i], reverse=True)
+    ranked = [values[i] for i in order]
+    heap = []  # min-heap of (product, combo) holding the best top_n so far
+
+    def best_completion(start, remaining):
+        # Sorted descending, so the next `remaining` values are the best possible tail.
+        product = 1.0
+        for value in ranked[start:start + remaining]:
+            product *= value
+        return product
+
+    def search(start, combo, product):
+        remaining = legs - len(combo)
+        if remaining == 0:
+            entry = (product, tuple(-i for i in combo))
+            if len(heap) < top_n:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+            return
+        for i in range(start, n - remaining + 1):
+            bound = product * best_completion(i, remaining)
+            # Bounds only shrink as i grows, so the first miss ends this level.
+            if len(heap) == top_n and bound <= heap[0][0]:
+                break
+            combo.append(i)
+            search(i + 1, combo, product * ranked[i])
+            combo.pop()
+
+    search(0, [], 1.0)
+    best = sorted(heap, reverse=True)
+    return [(tuple(order[-i] for i in combo), product) for product, combo in best]
+
+
+def top_parlays(probs, legs=2, top_n=3, implied_prob=None):
+    """Best ``legs``-leg parlays from a list of true hit probabilities (0-1).
+
+    With a single parlay price (``implied_prob``) EV is a monotone function
+    of the true probability, so ranking by probability and by EV agree.
+    Returns dicts with the leg indices, true probability and EV%.
+    """
+    results = []
+    for legs_idx, prob in top_k_products(probs, legs, top_n):
+        result = {"legs": legs_idx, "prob": prob}
+        if implied_prob is not None:
+            result["ev"] = (prob - implied_prob) * 100
+        results.append(result)
+    return results
+
+
+def top_priced_parlays(probs, odds, legs=2, top_n=3):
+    """Best ``legs``-leg parlays by expected return, each leg paid at its own American odds.
+
+    Legs without a posted price (odds strictly between -100 and +100, or
+    NaN) are skipped. Returns dicts with the leg indices, true probability,
+    decimal odds, implied probability, ROI% (expected profit per 100 staked,
+    not the board's EV%) and edge (true minus implied probability, in
+    points), best first.
+    """
+    if not MIN_LEGS <= legs <= MAX_LEGS:
+        raise ValueError(f"legs must be between {MIN_LEGS} and {MAX_LEGS}")
+    probs = np.asarray(probs, dtype=float)
+    odds = np.asarray(odds, dtype=float)
+    priced = np.flatnonzero(~np.isnan(odds) & ((odds <= -100) | (odds >= 100)))
+    if legs > len(priced) or top_n <= 0:
+        return []
+    decimal = np.asarray(american_to_decimal(odds[priced]), dtype=float)
+    pool = np.argsort(-(probs[priced] * decimal), kind="stable")[:top_n + legs - 1]
+    combos = np.array(list(itertools.combinations(pool.tolist(), legs)))
+    with np.errstate(divide="ignore"):
+        log_prob = np.log(probs[priced])[combos].sum(axis=1)
+    log_decimal = np.log(decimal)[combos].sum(axis=1)
+    prob, parlay_decimal = np.exp(log_prob), np.exp(log_decimal)
+    roi = (np.exp(log_prob + log_decimal) - 1) * 100
+    best = np.argsort(-roi, kind="stable")[:top_n]
+    return [
+        {"legs": tuple(priced[combos[i]].tolist()), "prob": float(prob[i]), "decimal_odds": float(parlay_decimal[i]),
+         "implied": float(1 / parlay_decimal[i]), "roi": float(roi[i]), "edge": float((prob[i] - 1 / parlay_decimal[i]) * 100)}
+        for i in best.tolist()
+    ]
+
+
+class Parlay:
+    """Parlay slip of independent legs, keyed by any hashable (e.g. a board id).
+
+    Each leg has a true hit probability (0-1) and optionally its American
+    odds; legs without a posted price (None, or strictly between -100 and
+    +100) leave the slip unpriced, so EV then needs an explicit parlay price.
+    """
+
+    def __init__(self, legs=()):
+        self._legs = {}  # key -> (prob, decimal odds or None)
+        self._log_prob = 0.0
+        self._log_decimal = 0.0
+        self._zero_legs = 0  # legs with prob 0, kept out of the log sum
+        self._unpriced = 0
+        self.version = None
+        for key, prob, odds in legs:
+            self.add(key, prob, odds)
+
+    def __len__(self):
+        return len(self._legs)
+
+    def __contains__(self, key):
+        return key in self._legs
+
+    def __iter__(self):
+        return iter(self._legs)
+
+    def add(self, key, prob, odds=None):
+        if key in self._legs:
+            raise ValueError(f"leg {key!r} is already on the slip")
+        if not 0 <= prob <= 1:
+            raise ValueError(f"leg probability must be between 0 and 1, got {prob}")
+        decimal = None if odds is None or -100 < odds < 100 else american_to_decimal(odds)
+        self._legs[key] = (prob, decimal)
+        if prob > 0:
+            self._log_prob += math.log(prob)
+        else:
+            self._zero_legs += 1
+        if decimal is None:
+            self._unpriced += 1
+        else:
+            self._log_decimal += math.log(decimal)
+
+    def remove(self, key):
+        prob, decimal = self._legs.pop(key)
+        if prob > 0:
+            self._log_prob -= math.log(prob)
+        else:
+            self._zero_legs -= 1
+        if decimal is None:
+            self._unpriced -= 1
+        else:
+            self._log_decimal -= math.log(decimal)
+        if not self._legs:
+            self._log_prob = self._log_decimal = 0.0  # drop accumulated rounding
+
+    def clear(self):
+        for key in list(self._legs):
+            self.remove(key)
+
+    def sync(self, keys, leg, version=None):
+        """Make the slip hold exactly ``keys``, calling ``leg(key) -> (prob, odds)`` only for new ones.
+
+        A change of ``version`` (e.g. the board's) re-reads every leg.
+        """
+        if version != self.version:
+            self.clear()
+            self.version = version
+        keys = list(dict.fromkeys(keys))
+        wanted = set(keys)
+        for key in [key for key in self._legs if key not in wanted]:
+            self.remove(key)
+        for key in keys:
+            if key not in self._legs:
+                self.add(key, *leg(key))
+
+    @property
+    def prob(self):
+        """True probability that every leg hits."""
+        return 0.0 if self._zero_legs else math.exp(self._log_prob)
+
+    @property
+    def decimal_odds(self):
+        """Payout per unit staked from the legs' own prices, or None if a leg is unpriced."""
+        return None if self._unpriced else math.exp(self._log_decimal)
+
+    @property
+    def implied_prob(self):
+        return None if self._unpriced else math.exp(-self._log_decimal)
+
+    def ev(self, implied_prob=None):
+        """EV% (true minus implied probability, x100) against ``implied_prob`` or the legs' own prices."""
+        implied_prob = self.implied_prob if implied_prob is None else implied_prob
+        return None if implied_prob is None else (self.prob - implied_prob) * 100
+
+    def legs(self):
+        """Per-leg breakdown: probability, decimal odds, the leg's own EV% and its EV contribution.
+
+        ``contribution`` is the parlay's EV% minus the EV% of the slip without
+        that leg, both priced from leg odds (None while the slip is unpriced);
+        each is O(1) from the running sums.
+        """
+        parlay_ev = self.ev()
+        rows = []
+        for key, (prob, decimal) in self._legs.items():
+            row = {"key": key, "prob": prob, "decimal_odds": decimal,
+                   "ev": None if decimal is None else (prob - 1 / decimal) * 100, "contribution": None}
+            if parlay_ev is not None and prob > 0:
+                without_prob = 0.0 if self._zero_legs else math.exp(self._log_prob - math.log(prob))
+                without_ev = (without_prob - math.exp(-(self._log_decimal - math.log(decimal)))) * 100
+                row["contribution"] = parlay_ev - without_ev
+            rows.append(row)
+        return rows
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from moneyball_odds import implied_to_american
+
+    rng = random.Random(0)
+    board = [rng.uniform(0.45, 0.9) for _ in range(300)]
+    for legs in range(MIN_LEGS, MAX_LEGS + 1):
+        start = time.perf_counter()
+        top = top_parlays(board, legs, top_n=10)
+        elapsed = time.perf_counter() - start
+        print(f"{legs} legs over {len(board)} players: {elapsed * 1000:.1f} ms, best {top[0]['prob']:.4f}")
+
+    # Per-leg pricing: pool pass vs brute force over every combination.
+    odds = [round(implied_to_american(min(max(p + rng.gauss(0.03, 0.04), 0.05), 0.95))) for p in board]
+    top_priced_parlays(board, odds, 3)  # build the odds table first
+    for legs in range(MIN_LEGS, MAX_LEGS + 1):
+        start = time.perf_counter()
+        priced = top_priced_parlays(board, odds, legs, top_n=10)
+        elapsed = time.perf_counter() - start
+        print(f"{legs} legs priced at leg odds over {len(board)} players: {elapsed * 1000:.2f} ms, "
+              f"best ROI% {priced[0]['roi']:+.1f} at {priced[0]['decimal_odds']:.2f}")
+    sample = 60
+    brute = sorted(itertools.combinations(range(sample), 3), reverse=True,
+                   key=lambda c: math.prod(board[i] * american_to_decimal(odds[i]) for i in c))[:10]
+    assert [set(p["legs"]) for p in top_priced_parlays(board[:sample], odds[:sample], 3, top_n=10)] == list(map(set, brute))
+
+    # Builder slip: toggle one leg on a 50-leg slip, vs re-multiplying every leg.
+    slip = Parlay((i, board[i], -150) for i in range(50))
+    start = time.perf_counter()
+    for _ in range(10_000):
+        slip.remove(0)
+        slip.add(0, board[0], -150)
+    toggle = (time.perf_counter() - start) / 10_000
+    start = time.perf_counter()
+    for _ in range(10_000):
+        product = 1.0
+        for i in range(50):
+            product *= board[i]
+    recompute = (time.perf_counter() - start) / 10_000
+    assert math.isclose(slip.prob, product, rel_tol=1e-9)
+    print(f"50-leg slip: add/remove a leg {toggle * 1e6:.2f} us vs recompute {recompute * 1e6:.2f} us, "
+          f"EV% at leg prices {slip.ev():.2f}")
@@ -0,0 +1,236 @@
+"""Incrementally maintained rankings for the Top Hit Board.
+
+Re-sorting the whole board on every change made each added slate cost
+O(n log n) however few rows moved. A ``BoardRanking`` keeps the board's
+rows in an indexable skip list ordered by a tuple of sort keys (true
+probability, EV, zone, ... each descending, then board id), so inserting,
+updating or removing a player is O(log n), and a player's rank or the
+top K players come straight out of the list without sorting.
+
+Missing values rank last; a missing de-vigged value (``fair_ev``,
+``fair_implied``) falls back to the sportsbook one, as on the board.
+"""
+import math
+import random
+
+import numpy as np
+
+RANK_FIELDS = ("prob", "ev", "implied", "fair_implied", "fair_ev", "avg", "odds", "zone")
+_FALLBACK = {"fair_ev": "ev", "fair_implied": "implied"}
+_MAX_LEVELS = 32
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, levels):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class IndexedSkipList:
+    """Sorted list of unique keys with O(log n) insert, remove, rank and index."""
+
+    def __init__(self, keys=()):
+        self._random = random.Random(0)
+        self.load(keys)
+
+    def __len__(self):
+        return self._size
+
+    def _levels(self):
+        return min(_MAX_LEVELS, 1 - int(math.log(1.0 - self._random.random(), 2)))
+
+    def load(self, keys):
+        """Replace the contents with ``keys`` (sorted here), in O(n log n)."""
+        self._head = _Node(None, _MAX_LEVELS)
+        last, last_pos = [self._head] * _MAX_LEVELS, [0] * _MAX_LEVELS
+        keys = sorted(keys)
+        levels = np.minimum(np.random.default_rng(self._random.getrandbits(32)).geometric(0.5, len(keys)), _MAX_LEVELS)
+        for pos, (key, height) in enumerate(zip(keys, levels.tolist()), 1):
+            node = _Node(key, height)
+            if height == 1:
+                last[0].next[0] = node
+                last[0].width[0] = pos - last_pos[0]
+                last[0], last_pos[0] = node, pos
+                continue
+            for level in range(height):
+                last[level].next[level] = node
+                last[level].width[level] = pos - last_pos[level]
+                last[level], last_pos[level] = node, pos
+        for level in range(_MAX_LEVELS):
+            last[level].width[level] = len(keys) + 1 - last_pos[level]
+        self._size = len(keys)
+
+    def _chain(self, key):
+        """Last node before ``key`` on every level, and the rank of each."""
+        chain, steps = [None] * _MAX_LEVELS, [0] * _MAX_LEVELS
+        node, position = self._head, 0
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level], steps[level] = node, position
+        return chain, steps
+
+    def insert(self, key):
+        chain, steps = self._chain(key)
+        node = _Node(key, self._levels())
+        below = steps[0]
+        for level in range(len(node.next)):
+            prev = chain[level]
+            node.next[level] = prev.next[level]
+            prev.next[level] = node
+            node.width[level] = prev.width[level] - (below - steps[level])
+            prev.width[level] = below - steps[level] + 1
+        for level in range(len(node.next), _MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain, _ = self._chain(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            prev = chain[level]
+            prev.width[level] += node.width[level] - 1
+            prev.next[level] = node.next[level]
+        for level in range(len(node.next), _MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def rank(self, key):
+        """0-based position of ``key``."""
+        chain, steps = self._chain(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        return steps[0]
+
+    def _node_at(self, index):
+        node, remaining = self._head, index + 1
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("skip list index out of range")
+        return self._node_at(index).key
+
+    def islice(self, start=0, stop=None):
+        """Keys from position ``start`` up to ``stop``, walking the bottom level."""
+        stop = self._size if stop is None else min(stop, self._size)
+        node = self._node_at(start) if start > 0 else self._head.next[0]
+        for _ in range(max(stop - start, 0)):
+            yield node.key
+            node = node.next[0]
+
+    def __iter__(self):
+        return self.islice()
+
+
+class BoardRanking:
+    """Board ids ordered by ``by`` (field names, each descending), ties by id."""
+
+    def __init__(self, by=("prob",)):
+        by = tuple(by)
+        unknown = [field for field in by if field not in RANK_FIELDS]
+        if not by or unknown:
+            raise ValueError(f"rank fields must be among {', '.join(RANK_FIELDS)}, got {by!r}")
+        self.by = by
+        self._list = IndexedSkipList()
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _keys_for(self, rows):
+        """{id: sort key} for a structured array of board rows."""
+        columns = []
+        for field in self.by:
+            values = rows[field].astype(float)
+            if field in _FALLBACK:
+                values = np.where(np.isnan(values), rows[_FALLBACK[field]], values)
+            columns.append(np.where(np.isnan(values), np.inf, -values).tolist())
+        ids = rows["id"].tolist()
+        return dict(zip(ids, zip(*columns, ids)))
+
+    def load(self, rows):
+        """Rebuild from a structured array of board rows."""
+        self._keys = self._keys_for(rows)
+        self._list.load(self._keys.values())
+
+    def add(self, rows):
+        keys = self._keys_for(rows)
+        self._keys.update(keys)
+        if len(keys) > max(len(self._keys) // 2, 64):
+            # Big batch (e.g. a whole slate on a small board): one sort beats n inserts.
+            self._list.load(self._keys.values())
+            return
+        for key in keys.values():
+            self._list.insert(key)
+
+    def discard(self, ids):
+        for player_id in np.atleast_1d(ids).tolist():
+            key = self._keys.pop(player_id, None)
+            if key is not None:
+                self._list.remove(key)
+
+    def refresh(self, row):
+        """Re-rank one row after its fields changed."""
+        (player_id, key), = self._keys_for(np.atleast_1d(row)).items()
+        old = self._keys.get(player_id)
+        if old != key:
+            if old is not None:
+                self._list.remove(old)
+            self._list.insert(key)
+            self._keys[player_id] = key
+
+    def rank(self, player_id):
+        """1-based rank of the player with this board id."""
+        return self._list.rank(self._keys[player_id]) + 1
+
+    def top(self, k=None, start=0):
+        """Board ids ranked ``start + 1`` through ``start + k`` (all remaining if ``k`` is None)."""
+        stop = None if k is None else start + k
+        return np.fromiter((key[-1] for key in self._list.islice(start, stop)), dtype=np.int64)
+
+
+if __name__ == "__main__":
+    import time
+
+    from moneyball_board import ZONES, HitBoard
+
+    rng = np.random.default_rng(0)
+
+    def slate(n):
+        probs = rng.uniform(40, 90, n).round(1)
+        return [{"name": f"Player {i}", "prob": float(p), "zone": ZONES[int(p > 60) + int(p > 70) + int(p > 80)],
+                 "ev": round(float(p) - 55, 1), "odds": -120, "implied": 54.5} for i, p in enumerate(probs)]
+
+    board = HitBoard(slate(100_000))
+    ranking = board.ranking(("prob", "ev"))
+    rows = rng.integers(0, len(board), 1000).tolist()
+    start = time.perf_counter()
+    for row in rows:
+        board.update(row, prob=float(rng.uniform(40, 90)))
+    per_update = (time.perf_counter() - start) / len(rows)
+    start = time.perf_counter()
+    for _ in range(10):
+        np.lexsort((board.rows["id"], -board.rows["ev"], -board.rows["prob"]))
+    per_sort = (time.perf_counter() - start) / 10
+    start = time.perf_counter()
+    board.table(by=("prob", "ev"), top=50)
+    render = time.perf_counter() - start
+    print(f"{len(board)} players: update + re-rank {per_update * 1e6:.0f} us vs full re-sort {per_sort * 1e6:.0f} us; "
+          f"top-50 table after a change {render * 1000:.2f} ms")
+    expected = np.lexsort((board.rows["id"], -board.rows["ev"], -board.rows["prob"].astype(float)))
+    assert (board.positions(ranking.top()) == expected).all()
+    assert board.rank(expected[10], ("prob", "ev")) == 11
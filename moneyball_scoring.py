@@ -0,0 +1,194 @@
+"""Vectorized hit probability scoring for whole slates.
+
+``score_slate`` runs the ``moneyball_core`` formulas over whole columns at
+once so a full slate (every batter plus alternate lineups) is scored in a
+single call. The scalar helpers are re-exported from ``moneyball_core``.
+"""
+import numpy as np
+import pandas as pd
+
+from moneyball_core import (
+    HAND_WEIGHT,
+    MAX_AB,
+    MIN_AB,
+    RECENT_WEIGHT,
+    SEASON_WEIGHT,
+    SPLIT_WEIGHT,
+    ZONE_THRESHOLDS,
+    ab_distribution_lookup,
+    batting_order_ab_lookup,
+    binomial_hit_probability,
+    calculate_weighted_avg,
+    classify_zone,
+    pitcher_weight,
+    score_player,
+    slot_hit_probability,
+)
+from moneyball_odds import american_to_implied
+
+# Index 0 is unused so a lineup slot can index the array directly.
+AB_BY_SLOT = np.array([np.nan] + [batting_order_ab_lookup[i] for i in range(1, 10)])
+
+# At-bat distributions (see moneyball_core) as a (slot, at-bat count) table.
+AB_COUNTS = np.arange(MIN_AB, MAX_AB + 1)
+AB_DISTRIBUTION_BY_SLOT = np.zeros((10, AB_COUNTS.size))
+for _slot, _dist in ab_distribution_lookup.items():
+    AB_DISTRIBUTION_BY_SLOT[_slot] = [weight for _, weight in _dist]
+
+# Pitcher weight (and the resulting total weight) indexed by tier:
+# no ABs vs pitcher, 1-6 ABs, 7+ ABs.
+PITCHER_WEIGHT_BY_TIER = np.array([0.0, 0.1, 0.3])
+TOTAL_WEIGHT_BY_TIER = SEASON_WEIGHT + RECENT_WEIGHT + SPLIT_WEIGHT + PITCHER_WEIGHT_BY_TIER + HAND_WEIGHT
+
+ZONE_LABELS = np.array(["Bad", "Moderate", "Strong", "Elite"], dtype=object)
+# score_slate hands zones out as a categorical, the way HitBoard.table does:
+# gathering 10k labels into an object array costs more than the rest of the scoring.
+ZONE_DTYPE = pd.CategoricalDtype(ZONE_LABELS.tolist(), ordered=True)
+
+
+# --- Vectorized Slate Scoring ---
+def _column(values):
+    """Float column where None entries become NaN; a missing column stays None."""
+    if values is None:
+        return None
+    arr = np.asarray(values, dtype=object if isinstance(values, (list, tuple)) else None)
+    if arr.dtype == object:
+        arr = np.array([np.nan if v is None else v for v in arr], dtype=float)
+    return arr.astype(float, copy=False)
+
+
+def weighted_avg_batch(season, last7, split, hand_avg=None, pitcher_avg=None, pitcher_ab=0):
+    season = _column(season)
+    last7 = _column(last7)
+    split = _column(split)
+    hand_avg = _column(hand_avg)
+    pitcher_avg = _column(pitcher_avg)
+    pitcher_ab = np.broadcast_to(np.asarray(pitcher_ab), season.shape)
+
+    tier = (pitcher_ab > 0).view(np.int8)
+    tier += pitcher_ab >= 7
+    # Same operand order as the scalar version so results match bit for bit;
+    # every term goes through one scratch buffer, missing values masked to 0.
+    weighted_sum = season * SEASON_WEIGHT
+    term = np.multiply(last7, RECENT_WEIGHT, out=np.empty_like(weighted_sum))
+    weighted_sum += term
+    weighted_sum += np.multiply(split, SPLIT_WEIGHT, out=term)
+    if pitcher_avg is not None:
+        PITCHER_WEIGHT_BY_TIER.take(tier, out=term)
+        term *= pitcher_avg
+        np.copyto(term, 0.0, where=np.isnan(term))
+        weighted_sum += term
+    if hand_avg is not None:
+        np.multiply(hand_avg, HAND_WEIGHT, out=term)
+        np.copyto(term, 0.0, where=np.isnan(term))
+        weighted_sum += term
+    weighted_sum /= TOTAL_WEIGHT_BY_TIER.take(tier, out=term)
+    return weighted_sum
+
+
+def binomial_hit_probability_batch(avg, ab):
+    # NumPy's SIMD pow can land one ulp away from Python's ``**``; that never
+    # survives the board's one-decimal rounding.
+    return 1 - np.power(1 - np.asarray(avg, dtype=float), np.asarray(ab, dtype=float))
+
+
+def _zone_codes(prob):
+    low, mid, high = ZONE_THRESHOLDS
+    zone = (prob > low).view(np.int8)
+    zone += prob > mid
+    zone += prob > high
+    return zone
+
+
+def classify_zone_batch(prob):
+    return ZONE_LABELS.take(_zone_codes(np.asarray(prob, dtype=float)))
+
+
+def _slots(batting_order):
+    slots = np.asarray(batting_order, dtype=np.intp)
+    if slots.size and (slots.min() < 1 or slots.max() > 9):
+        raise ValueError("batting_order must be between 1 and 9")
+    return slots
+
+
+def expected_ab_batch(batting_order):
+    return AB_BY_SLOT[_slots(batting_order)]
+
+
+def slot_hit_probability_batch(avg, batting_order):
+    miss = 1 - np.asarray(avg, dtype=float)
+    slots = _slots(batting_order)
+    # Horner's rule over the slot's weights, highest at-bat count first.
+    prob_no_hit = np.zeros(np.broadcast_shapes(miss.shape, slots.shape))
+    for j in range(AB_COUNTS.size - 1, -1, -1):
+        prob_no_hit *= miss
+        prob_no_hit += AB_DISTRIBUTION_BY_SLOT[:, j].take(slots)
+    return 1 - prob_no_hit * miss ** MIN_AB
+
+
+def score_slate(season, last7, split, hand_avg=None, pitcher_avg=None, pitcher_ab=0, batting_order=1, odds=0,
+                ab_distribution=False):
+    """Score a whole slate of batters in one call.
+
+    Every argument is a column (list, array or pandas Series) of equal
+    length; ``hand_avg``/``pitcher_avg`` may be None or contain None/NaN for
+    missing values. Scalars broadcast. Returns a dict of NumPy columns with
+    the same keys as ``score_player``, plus ``expected_ab``; ``zone`` is a
+    ``pandas.Categorical`` of the zone labels (``ZONE_DTYPE``).
+
+    With ``ab_distribution=True`` the true hit probability is mixed over
+    each slot's at-bat distribution instead of using the fractional mean.
+    """
+    weighted_avg, slots = np.broadcast_arrays(
+        weighted_avg_batch(season, last7, split, hand_avg, pitcher_avg, pitcher_ab), _slots(batting_order)
+    )
+    expected_ab = AB_BY_SLOT.take(slots)
+    if ab_distribution:
+        true_hit_prob = slot_hit_probability_batch(weighted_avg, slots)
+    else:
+        # binomial_hit_probability_batch, in place on one fresh array.
+        true_hit_prob = np.power(1 - weighted_avg, expected_ab)
+        np.subtract(1, true_hit_prob, out=true_hit_prob)
+    implied_prob = np.broadcast_to(american_to_implied(odds), weighted_avg.shape)
+    ev = true_hit_prob - implied_prob
+    ev *= 100
+    return {
+        "weighted_avg": weighted_avg,
+        "expected_ab": expected_ab,
+        "prob": true_hit_prob,
+        "implied": implied_prob,
+        "ev": ev,
+        "zone": pd.Categorical.from_codes(_zone_codes(true_hit_prob), dtype=ZONE_DTYPE, validate=False),
+    }
+
+
+if __name__ == "__main__":
+    import timeit
+
+    rng = np.random.default_rng(0)
+    n = 10_000
+    cols = dict(
+        season=rng.uniform(0.15, 0.35, n),
+        last7=rng.uniform(0.0, 0.5, n),
+        split=rng.uniform(0.15, 0.35, n),
+        hand_avg=rng.uniform(0.15, 0.35, n),
+        pitcher_avg=rng.uniform(0.0, 0.5, n),
+        pitcher_ab=rng.integers(0, 20, n),
+        batting_order=rng.integers(1, 10, n),
+        odds=rng.integers(-400, 200, n),
+    )
+    rows = [dict(zip(cols, vals)) for vals in zip(*(c.tolist() for c in cols.values()))]
+
+    scalar = [score_player(**row) for row in rows]
+    batch = score_slate(**cols)
+    loop_time = min(timeit.repeat(lambda: [score_player(**row) for row in rows], number=1, repeat=5))
+    batch_time = min(timeit.repeat(lambda: score_slate(**cols), number=1, repeat=200))
+
+    for key in ("weighted_avg", "implied"):
+        assert np.array_equal(batch[key], [r[key] for r in scalar]), key
+    for key in ("prob", "ev"):
+        assert np.allclose(batch[key], [r[key] for r in scalar], rtol=0, atol=1e-12), key
+    assert np.array_equal(np.round(batch["prob"] * 100, 1), [round(r["prob"] * 100, 1) for r in scalar])
+    assert list(batch["zone"]) == [r["zone"] for r in scalar]
+    print(f"{n} rows: loop {loop_time * 1000:.1f} ms, batch {batch_time * 1000:.2f} ms, "
+          f"{loop_time / batch_time:.0f}x faster")
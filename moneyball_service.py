@@ -0,0 +1,269 @@
+"""Local HTTP scoring service for the hit probability model.
+
+    python moneyball_service.py --port 8765
+
+Endpoints (JSON in, JSON out):
+
+- ``POST /score``: one player, with the ``score_player`` argument names
+  (``season``, ``last7``, ``split`` required; ``hand_avg``,
+  ``pitcher_avg``, ``pitcher_ab``, ``batting_order``, ``odds`` optional);
+- ``POST /slate``: ``{"players": [...]}`` (or a bare list), scored in one
+  ``score_slate`` call;
+- ``GET /metrics``: request and error counts, p50/p99 latency over the
+  last ``LATENCY_WINDOW`` requests, throughput and batching counters;
+- ``GET /health``.
+
+Concurrent ``/score`` requests are coalesced: the first one to arrive
+starts a ``max_delay`` timer (a couple of milliseconds) and everything
+that arrives before it fires, or until ``max_batch`` players are waiting,
+is scored in a single vectorized ``score_slate`` call. Under load that
+turns thousands of per-request Python scoring calls into a few NumPy
+calls; a lone request waits at most ``max_delay``.
+
+Standard library asyncio only (plus NumPy for the scoring), keep-alive
+HTTP/1.1, bound to localhost by default; nothing is fetched from the
+network. ``moneyball_service_load.py`` is a load generator for it.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import math
+import time
+
+import numpy as np
+
+from moneyball_scoring import score_slate
+
+PLAYER_FIELDS = ("season", "last7", "split", "hand_avg", "pitcher_avg", "pitcher_ab", "batting_order", "odds")
+REQUIRED_FIELDS = ("season", "last7", "split")
+AVG_FIELDS = ("season", "last7", "split", "hand_avg", "pitcher_avg")
+RESULT_FIELDS = ("weighted_avg", "expected_ab", "prob", "implied", "ev", "zone")
+MAX_BATCH = 512
+MAX_DELAY = 0.002
+MAX_BODY = 8 * 1024 * 1024
+LATENCY_WINDOW = 10_000
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+            500: "Internal Server Error"}
+
+
+# --- Request Parsing and Scoring ---
+def parse_player(obj):
+    """Validate one player's JSON object into a row of floats (NaN = missing)."""
+    if not isinstance(obj, dict):
+        raise ValueError("player must be a JSON object")
+    missing = [f for f in REQUIRED_FIELDS if obj.get(f) is None]
+    if missing:
+        raise ValueError(f"missing required fields: {', '.join(missing)}")
+    row = []
+    for field in PLAYER_FIELDS:
+        value = obj.get(field)
+        if value is None:
+            value = 1 if field == "batting_order" else 0 if field in ("pitcher_ab", "odds") else math.nan
+        elif isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"{field} must be a number")
+        elif field in AVG_FIELDS and not 0 <= value <= 1:
+            raise ValueError(f"{field} must be between 0 and 1")
+        elif field == "batting_order" and value not in range(1, 10):
+            raise ValueError("batting_order must be 1-9")
+        elif field == "pitcher_ab" and (value < 0 or value % 1):
+            raise ValueError("pitcher_ab must be a whole number >= 0")
+        row.append(value)
+    return row
+
+
+def score_rows(rows, ab_distribution=False):
+    """Score parsed rows with one ``score_slate`` call; returns one dict per row."""
+    cols = np.array(rows, dtype=float).reshape(-1, len(PLAYER_FIELDS)).T
+    season, last7, split, hand_avg, pitcher_avg, pitcher_ab, batting_order, odds = cols
+    scored = score_slate(season, last7, split, hand_avg, pitcher_avg, pitcher_ab, batting_order.astype(np.intp),
+                         odds, ab_distribution=ab_distribution)
+    columns = [scored[f].tolist() for f in RESULT_FIELDS]
+    return [dict(zip(RESULT_FIELDS, values)) for values in zip(*columns)]
+
+
+class MicroBatcher:
+    """Collect concurrent single-player requests and score them together."""
+
+    def __init__(self, score, max_batch=MAX_BATCH, max_delay=MAX_DELAY):
+        self._score = score
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+        self.batches = 0
+        self.batched_rows = 0
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.batches += 1
+        self.batched_rows += len(pending)
+        try:
+            results = self._score([row for row, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+
+# --- Metrics ---
+class ServiceMetrics:
+    """Request counters and a sliding window of latencies."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time.monotonic()
+        self.requests = collections.Counter()
+        self.errors = 0
+        self._recent = collections.deque(maxlen=window)  # (finished at, latency in s)
+
+    def record(self, route, status, latency):
+        self.requests[route] += 1
+        if status >= 400:
+            self.errors += 1
+        self._recent.append((time.monotonic(), latency))
+
+    def snapshot(self, batcher=None):
+        now = time.monotonic()
+        total = sum(self.requests.values())
+        latencies = np.array([latency for _, latency in self._recent])
+        span = now - self._recent[0][0] if self._recent else 0.0
+        snapshot = {
+            "uptime_s": round(now - self.started, 3),
+            "requests": dict(self.requests),
+            "errors": self.errors,
+            "throughput_rps": round(total / max(now - self.started, 1e-9), 1),
+            "recent_rps": round(len(latencies) / span, 1) if span > 0 else 0.0,
+            "latency_window": len(latencies),
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3) if latencies.size else None,
+            "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 3) if latencies.size else None,
+        }
+        if batcher is not None:
+            snapshot["batches"] = batcher.batches
+            snapshot["mean_batch_size"] = round(batcher.batched_rows / batcher.batches, 2) if batcher.batches else 0.0
+        return snapshot
+
+
+# --- HTTP Server ---
+class ScoringService:
+    def __init__(self, max_batch=MAX_BATCH, max_delay=MAX_DELAY, ab_distribution=False):
+        self.ab_distribution = ab_distribution
+        self.batcher = MicroBatcher(self._score, max_batch, max_delay)
+        self.metrics = ServiceMetrics()
+
+    def _score(self, rows):
+        return score_rows(rows, self.ab_distribution)
+
+    async def _route(self, method, path, body):
+        if path in ("/health", "/metrics"):
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            return 200, self.metrics.snapshot(self.batcher) if path == "/metrics" else {"status": "ok"}
+        if path not in ("/score", "/slate"):
+            return 404, {"error": f"no route {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            payload = json.loads(body)
+            if path == "/score":
+                return 200, await self.batcher.submit(parse_player(payload))
+            players = payload.get("players") if isinstance(payload, dict) else payload
+            if not isinstance(players, list):
+                raise ValueError('slate must be a list or {"players": [...]}')
+            rows = []
+            for i, player in enumerate(players, start=1):
+                try:
+                    rows.append(parse_player(player))
+                except ValueError as e:
+                    raise ValueError(f"player {i}: {e}") from None
+            return 200, {"results": self._score(rows) if rows else []}
+        except ValueError as e:  # includes JSONDecodeError
+            return 400, {"error": str(e)}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                start = time.perf_counter()
+                path = target.split("?", 1)[0]
+                if length > MAX_BODY:
+                    status, payload = 413, {"error": f"body over {MAX_BODY} bytes"}
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self._route(method, path, body)
+                    except Exception as e:
+                        status, payload = 500, {"error": repr(e)}
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                              and status != 413)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode() + data
+                )
+                await writer.drain()
+                self.metrics.record(path, status, time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # client went away or sent something that is not HTTP
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the hit probability model over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="flush a batch at this many players")
+    parser.add_argument("--max-delay-ms", type=float, default=MAX_DELAY * 1000,
+                        help="longest a /score request waits for others to batch with")
+    parser.add_argument("--ab-distribution", action="store_true",
+                        help="mix hit probability over each slot's at-bat distribution")
+    args = parser.parse_args(argv)
+    service = ScoringService(args.max_batch, args.max_delay_ms / 1000, args.ab_distribution)
+    print(f"scoring on http://{args.host}:{args.port} (batches of up to {args.max_batch}, "
+          f"{args.max_delay_ms:g} ms window)")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Load generator for moneyball_service.
+
+    python moneyball_service_load.py --spawn --concurrency 64 --duration 10
+
+Opens ``--concurrency`` keep-alive connections and sends random
+``/score`` requests (plus a ``/slate`` request every ``--slate-every``
+requests, if set) for ``--duration`` seconds, then prints client-side
+throughput and p50/p99 latency next to the server's ``/metrics``.
+``--spawn`` starts a service in a subprocess first, so a run needs
+nothing but this repo.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def random_player(rng):
+    return {
+        "season": round(rng.uniform(0.15, 0.35), 3),
+        "last7": round(rng.uniform(0.0, 0.5), 3),
+        "split": round(rng.uniform(0.15, 0.35), 3),
+        "hand_avg": round(rng.uniform(0.15, 0.35), 3),
+        "pitcher_avg": round(rng.uniform(0.0, 0.5), 3) if rng.random() < 0.7 else None,
+        "pitcher_ab": rng.randint(0, 20),
+        "batting_order": rng.randint(1, 9),
+        "odds": rng.randint(-400, 200),
+    }
+
+
+async def request(reader, writer, host, method, path, payload=None):
+    """Send one request on an open keep-alive connection; returns (status, JSON body)."""
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def _worker(host, port, deadline, seed, slate_every, latencies, failures):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = 0
+    try:
+        while time.perf_counter() < deadline:
+            sent += 1
+            if slate_every and sent % slate_every == 0:
+                path, payload = "/slate", {"players": [random_player(rng) for _ in range(300)]}
+            else:
+                path, payload = "/score", random_player(rng)
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, "POST", path, payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host, port, concurrency, duration, slate_every=0):
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(host, port, start + duration, seed, slate_every, latencies, failures)
+        for seed in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection(host, port)
+    _, metrics = await request(reader, writer, host, "GET", "/metrics")
+    writer.close()
+    latencies = np.array(latencies) * 1000
+    return {
+        "requests": latencies.size,
+        "failures": len(failures),
+        "rps": latencies.size / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "server": metrics,
+    }
+
+
+async def _wait_for(host, port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test moneyball_service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=64, help="open connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--slate-every", type=int, default=0, help="send a 300-player /slate every N requests")
+    parser.add_argument("--spawn", action="store_true", help="start a service in a subprocess first")
+    parser.add_argument("--max-batch", type=int, help="passed to the spawned service")
+    parser.add_argument("--max-delay-ms", type=float, help="passed to the spawned service")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        command = [sys.executable, "moneyball_service.py", "--host", args.host, "--port", str(args.port)]
+        if args.max_batch is not None:
+            command += ["--max-batch", str(args.max_batch)]
+        if args.max_delay_ms is not None:
+            command += ["--max-delay-ms", str(args.max_delay_ms)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(_wait_for(args.host, args.port))
+        result = asyncio.run(run(args.host, args.port, args.concurrency, args.duration, args.slate_every))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    server_metrics = result["server"]
+    print(f"{result['requests']} requests ({result['failures']} failed) in {args.duration:g} s "
+          f"over {args.concurrency} connections: {result['rps']:.0f} req/s")
+    print(f"client latency: p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+    print(f"server latency: p50 {server_metrics['p50_ms']} ms, p99 {server_metrics['p99_ms']} ms; "
+          f"{server_metrics['batches']} batches, mean {server_metrics['mean_batch_size']} players per batch")
+
+
+if __name__ == "__main__":
+    main()
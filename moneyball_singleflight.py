@@ -0,0 +1,173 @@
+"""Process-wide request coalescing ("single flight").
+
+Streamlit runs every browser session on its own thread, and each Fetch
+Stats click runs its own event loop, so at first pitch several analysts
+fetch the same players at the same moment. ``SingleFlight.do`` lets the
+first caller for a key run the fetch while every concurrent caller for
+the same key, on any thread or event loop, waits for that one result.
+Upstream calls then scale with unique keys rather than with users.
+
+Results are handed out through a thread-safe ``concurrent.futures.Future``
+that each waiter watches through its own loop future, so waiters get the
+same object as the leader (and must not mutate it), and cancelling one
+waiter, e.g. a sibling task torn down by ``asyncio.run``, never cancels
+the shared call. If the leader itself is cancelled, its waiters retry and
+the first one back leads a fresh call. Nothing is cached: once a call
+finishes, the next caller for the key starts a new one (the stats cache
+sits underneath for that).
+"""
+import asyncio
+import collections
+import concurrent.futures
+import threading
+
+
+class _Dropped(Exception):
+    """The leader was cancelled before finishing; waiters should retry."""
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.counters = collections.Counter()
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+            self.counters["calls" if leader else "shared"] += 1
+        return future, leader
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            del self._calls[key]
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        else:
+            # A cancelled leader must not cancel (or fail) waiters on other threads.
+            future.set_exception(error if isinstance(error, Exception) else _Dropped())
+
+    @staticmethod
+    async def _wait(future):
+        # A per-waiter future, fed from the shared one but never chained back to it.
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        def copy(done):
+            if waiter.done():
+                return
+            if done.cancelled():
+                waiter.set_exception(_Dropped())
+            elif done.exception() is not None:
+                waiter.set_exception(done.exception())
+            else:
+                waiter.set_result(done.result())
+
+        def relay(done):
+            try:
+                loop.call_soon_threadsafe(copy, done)
+            except RuntimeError:
+                pass  # the waiter's loop has already closed
+
+        future.add_done_callback(relay)
+        return await waiter
+
+    async def do(self, key, fn):
+        """Await ``fn()`` unless a call for ``key`` is already in flight, then share its result."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return await self._wait(future)
+            except _Dropped:
+                continue  # the first waiter back becomes the new leader
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.counters["calls"], "shared": self.counters["shared"], "in_flight": len(self._calls)}
+
+
+if __name__ == "__main__":
+    import time
+
+    from moneyball_stats_client import StatsClient, fetch_slate_stats_async
+    from moneyball_stats_fixture import FixtureServer
+
+    sessions = 8
+    slate = [{"player_id": 600000 + i, "pitcher_id": 700000 + i // 9} for i in range(60)]
+
+    def session(url, flights, barrier, results):
+        async def run():
+            async with StatsClient(url, single_flight=flights) as client:
+                return await fetch_slate_stats_async(slate, client)
+
+        barrier.wait()  # everyone clicks at first pitch
+        results.append(asyncio.run(run()))
+
+    async def first_pitch(flights):
+        async with FixtureServer(latency=0.05) as fixture:
+            barrier, results = threading.Barrier(sessions), []
+            threads = [threading.Thread(target=session, args=(fixture.url, flights, barrier, results))
+                       for _ in range(sessions)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            await asyncio.get_running_loop().run_in_executor(None, lambda: [t.join() for t in threads])
+            elapsed = time.perf_counter() - start
+        assert len(results) == sessions and all(r == results[0] for r in results)
+        return sum(fixture.requests.values()), elapsed
+
+    async def cancelled_waiter():
+        flights, release = SingleFlight(), asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "stats"
+
+        leader = asyncio.create_task(flights.do("k", slow))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(flights.do("k", slow)) for _ in range(3)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        release.set()
+        results = await asyncio.gather(leader, *waiters[1:])
+        assert waiters[0].cancelled() and results == ["stats"] * 3, results
+
+    asyncio.run(cancelled_waiter())
+
+    async def cancelled_leader():
+        flights, release = SingleFlight(), asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "stats"
+
+        leader = asyncio.create_task(flights.do("k", slow))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(flights.do("k", slow)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0.01)  # let the waiters regroup behind a new leader
+        release.set()
+        results = await asyncio.gather(*waiters)
+        assert results == ["stats"] * 3 and flights.counters["calls"] == 2, (results, flights.counters)
+
+    asyncio.run(cancelled_leader())
+
+    for label, flights in (("independent sessions", None), ("single flight", SingleFlight())):
+        requests, elapsed = asyncio.run(first_pitch(flights))
+        print(f"{label}: {sessions} sessions x {len(slate)} players -> {requests} upstream requests "
+              f"in {elapsed:.1f} s")
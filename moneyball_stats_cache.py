@@ -0,0 +1,155 @@
+"""Persistent cache for StatsAPI responses.
+
+Responses are stored in SQLite keyed by (player id, stat type, date,
+detail), where detail is the split code or opposing pitcher. Each stat
+type has its own TTL (``STAT_TTLS``): season lines and splits are
+considered fresh for a day, batter-vs-pitcher for a week. An expired
+entry is not dropped but revalidated: the next request sends its ETag
+(``If-None-Match``) and ``Last-Modified`` (``If-Modified-Since``), and a
+304 refreshes it without downloading the body again.
+
+The database lives in ``.cache/stats.sqlite3`` (or
+``MONEYBALL_STATS_CACHE``), so it survives restarts and is shared by
+every session and process on the machine; a warm restart serves a slate
+fetched earlier in the day without touching the network. Hit, miss and
+revalidation counters are kept per process for display in the apps.
+"""
+import collections
+import os
+import sqlite3
+import threading
+import time
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.environ.get("MONEYBALL_STATS_CACHE", os.path.join(_HERE, ".cache", "stats.sqlite3"))
+DAY = 24 * 60 * 60
+STAT_TTLS = {
+    "season": DAY, "last7": DAY, "split": DAY, "hand": DAY, "bvp": 7 * DAY, "search": 30 * DAY, "roster": DAY,
+}
+# Entries not refreshed for this long are deleted when the default cache opens.
+MAX_AGE = 60 * DAY
+
+CacheEntry = collections.namedtuple("CacheEntry", "body etag last_modified fetched_at")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    player_id TEXT NOT NULL,
+    stat_type TEXT NOT NULL,
+    date TEXT NOT NULL,
+    detail TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (player_id, stat_type, date, detail)
+) WITHOUT ROWID
+"""
+
+
+class StatsCache:
+    """SQLite-backed response cache; safe to share between threads."""
+
+    def __init__(self, path=CACHE_PATH, ttls=None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttls = {**STAT_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(_SCHEMA)
+        self.counters = collections.Counter()
+
+    def get(self, key):
+        """The stored entry for ``key`` (fresh or not), or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses "
+                "WHERE player_id = ? AND stat_type = ? AND date = ? AND detail = ?", key
+            ).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def is_fresh(self, key, entry, now=None):
+        return (now or time.time()) - entry.fetched_at < self.ttls[key[1]]
+
+    def put(self, key, body, etag=None, last_modified=None):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (*key, body, etag, last_modified, time.time()))
+
+    def touch(self, key):
+        """Mark ``key`` as fresh again after a 304."""
+        with self._lock:
+            self._db.execute("UPDATE responses SET fetched_at = ? "
+                             "WHERE player_id = ? AND stat_type = ? AND date = ? AND detail = ?", (time.time(), *key))
+
+    def record(self, outcome):
+        """Count a lookup outcome: "hits", "revalidated" or "misses"."""
+        with self._lock:
+            self.counters[outcome] += 1
+
+    def prune(self, max_age=MAX_AGE):
+        with self._lock:
+            return self._db.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - max_age,)).rowcount
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            hits, revalidated, misses = (self.counters[k] for k in ("hits", "revalidated", "misses"))
+        lookups = hits + revalidated + misses
+        return {
+            "hits": hits,
+            "revalidated": revalidated,
+            "misses": misses,
+            "entries": entries,
+            "hit_rate": (hits + revalidated) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """The process-wide cache at ``CACHE_PATH``, opened (and pruned) on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = StatsCache()
+            _default.prune()
+        return _default
+
+
+if __name__ == "__main__":
+    import asyncio
+    import tempfile
+
+    from moneyball_stats_client import StatsClient, fetch_slate_stats_async
+    from moneyball_stats_fixture import FixtureServer
+
+    slate = [{"player_id": 600000 + i, "home": i % 2 == 0, "pitcher_id": 700000 + i // 9} for i in range(300)]
+
+    async def run(path, ttls=None):
+        cache = StatsCache(path, ttls)
+        async with FixtureServer(latency=0.05) as fixture:
+            start = time.perf_counter()
+            async with StatsClient(fixture.url, cache=cache) as client:
+                results = await fetch_slate_stats_async(slate, client)
+            elapsed = time.perf_counter() - start
+        assert not any("error" in r for r in results)
+        stats = cache.stats()
+        cache.close()
+        return elapsed, sum(fixture.requests.values()) - fixture.requests["304"], stats
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.sqlite3")
+        for label, ttls in (("cold", None), ("warm restart", None), ("after TTLs expire", dict.fromkeys(STAT_TTLS, 0))):
+            elapsed, requests, stats = asyncio.run(run(path, ttls))
+            print(f"{label:>17}: {elapsed:5.2f} s, {requests:4d} requests, {stats['hits']} hits, "
+                  f"{stats['revalidated']} revalidated (304), {stats['misses']} downloaded")
@@ -0,0 +1,417 @@
+"""Concurrent MLB stats fetcher.
+
+Replaces the apps' placeholder ``fetch_mlb_stats``. Every request for a
+slate goes through one ``StatsClient``:
+
+- a keep-alive connection pool (HTTP/1.1, at most ``concurrency``
+  connections, so TCP/TLS setup is paid once per connection, not per
+  request);
+- a token bucket (``rate`` requests per second, ``burst`` at once) so a
+  300-player slate does not hammer the API;
+- retries with full-jitter exponential backoff on connection errors,
+  timeouts, 429 and 5xx (``Retry-After`` is honoured).
+
+Per batter it fetches the season line, the last 7 days, the home/away
+split, the split vs the starter's hand and batter-vs-pitcher, as separate
+StatsAPI calls that run concurrently. The result uses the slate import
+column names (``season_avg``, ``last7_avg``, ``split_avg``, ``hand_avg``,
+``pitcher_avg``, ``pitcher_ab``).
+
+Responses are cached on disk (``moneyball_stats_cache``): fresh entries
+are served without a request and expired ones are revalidated with
+ETag/If-Modified-Since, so repeat clicks and restarts cost little or
+nothing. Pass ``cache=False`` to the fetch functions to bypass it.
+Identical requests in flight at the same time, from any session or
+thread, share one upstream call (``moneyball_singleflight``).
+
+Standard library only. ``MONEYBALL_STATS_URL`` points the apps at another
+server, e.g. ``moneyball_stats_fixture.py`` for offline runs.
+"""
+import asyncio
+import datetime
+import gzip
+import json
+import os
+import random
+import ssl
+import time
+import urllib.parse
+
+from moneyball_singleflight import SingleFlight
+from moneyball_stats_cache import default_cache
+
+STATS_URL = os.environ.get("MONEYBALL_STATS_URL", "https://statsapi.mlb.com")
+CONCURRENCY = 16
+RATE = 100.0
+BURST = 50
+RETRIES = 4
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 8.0
+TIMEOUT = 10.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+STAT_TYPES = ("season", "last7", "split", "hand", "bvp")
+# Shared by every client in the process, i.e. every Streamlit session.
+IN_FLIGHT = SingleFlight()
+
+
+class StatsFetchError(Exception):
+    """A stats request failed for good (bad status or retries exhausted)."""
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class TokenBucket:
+    """Allow ``rate`` acquisitions per second on average, ``burst`` at once."""
+
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# --- HTTP ---
+async def _read_body(reader, headers):
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass  # trailers
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        return b"".join(chunks)
+    return await reader.readexactly(int(headers.get("content-length") or 0))
+
+
+class StatsClient:
+    """Pooled, rate-limited, retrying GET client for one stats API host.
+
+    Use as ``async with StatsClient() as client``; closing it closes the
+    pooled connections. With a ``cache`` (a ``StatsCache``), ``get_json``
+    calls that pass a ``cache_key`` go through it; ``single_flight=None``
+    turns off coalescing with other clients.
+    """
+
+    def __init__(self, base_url=None, concurrency=CONCURRENCY, rate=RATE, burst=BURST, retries=RETRIES,
+                 timeout=TIMEOUT, cache=None, single_flight=IN_FLIGHT):
+        url = urllib.parse.urlsplit(base_url or STATS_URL)
+        self.base_url = base_url or STATS_URL
+        self._host = url.hostname
+        self._tls = url.scheme == "https"
+        self._port = url.port or (443 if self._tls else 80)
+        self._prefix = url.path.rstrip("/")
+        self._idle = []
+        self._slots = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.timeout = timeout
+        self.cache = cache
+        self.single_flight = single_flight
+        self.requests = 0
+        self.retried = 0
+        self.connections_opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    async def _connection(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        self.connections_opened += 1
+        return await asyncio.open_connection(self._host, self._port,
+                                             ssl=ssl.create_default_context() if self._tls else None)
+
+    async def _send(self, target, headers):
+        reader, writer = await self._connection()
+        try:
+            lines = [f"GET {target} HTTP/1.1", f"Host: {self._host}", "Accept: application/json",
+                     "Accept-Encoding: gzip"]
+            lines += [f"{key}: {value}" for key, value in headers.items()]
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("connection closed before response")
+            status = int(status_line.split()[1])
+            response_headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                key, _, value = line.decode("latin-1").partition(":")
+                response_headers[key.strip().lower()] = value.strip()
+            body = await _read_body(reader, response_headers)
+        except BaseException:
+            writer.close()
+            raise
+        if response_headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        if response_headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return Response(status, response_headers, body)
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass  # an HTTP date; the jittered delay will do
+        return delay
+
+    def _target(self, path, params):
+        return self._prefix + path + ("?" + urllib.parse.urlencode(params) if params else "")
+
+    async def request(self, path, params=None, headers=None):
+        """GET ``path`` with retries; returns the final ``Response`` (2xx or 304)."""
+        target = self._target(path, params)
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            retry_after = None
+            try:
+                async with self._slots:
+                    self.requests += 1
+                    response = await asyncio.wait_for(self._send(target, headers or {}), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError, IndexError) as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.status < 400:
+                    return response
+                if response.status not in RETRY_STATUSES:
+                    raise StatsFetchError(f"GET {target}: HTTP {response.status}")
+                error = f"HTTP {response.status}"
+                retry_after = response.headers.get("retry-after")
+            if attempt < self.retries:
+                self.retried += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+        raise StatsFetchError(f"GET {target}: {error} after {self.retries + 1} attempts")
+
+    async def get_json(self, path, params=None, cache_key=None):
+        cache = self.cache if cache_key is not None else None
+        if cache is not None:
+            entry = cache.get(cache_key)
+            if entry is not None and cache.is_fresh(cache_key, entry):
+                cache.record("hits")
+                return json.loads(entry.body)
+        if self.single_flight is None:
+            return await self._fetch_json(path, params, cache, cache_key)
+        return await self.single_flight.do((self.base_url, self._target(path, params)),
+                                           lambda: self._fetch_json(path, params, cache, cache_key))
+
+    async def _fetch_json(self, path, params, cache, cache_key):
+        if cache is None:
+            return (await self.request(path, params)).json()
+        # Looked up again: a call that finished since the check in get_json may have filled it.
+        entry = cache.get(cache_key)
+        if entry is not None and cache.is_fresh(cache_key, entry):
+            cache.record("hits")
+            return json.loads(entry.body)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        response = await self.request(path, params, headers)
+        if response.status == 304 and entry is not None:
+            cache.touch(cache_key)
+            cache.record("revalidated")
+            return json.loads(entry.body)
+        cache.put(cache_key, response.body, response.headers.get("etag"), response.headers.get("last-modified"))
+        cache.record("misses")
+        return response.json()
+
+
+# --- StatsAPI Calls ---
+def stat_request(stat_type, player_id, date, home=True, pitcher_hand="R", pitcher_id=None):
+    """(path, params) of the StatsAPI call for one stat type, or None if not applicable."""
+    params = {"group": "hitting", "season": date.year}
+    if stat_type == "season":
+        params["stats"] = "season"
+    elif stat_type == "last7":
+        start = date - datetime.timedelta(days=7)
+        params.update(stats="byDateRange", startDate=start.isoformat(), endDate=(date - datetime.timedelta(days=1)).isoformat())
+    elif stat_type == "split":
+        params.update(stats="statSplits", sitCodes="h" if home else "a")
+    elif stat_type == "hand":
+        params.update(stats="statSplits", sitCodes="vl" if pitcher_hand == "L" else "vr")
+    elif stat_type == "bvp":
+        if pitcher_id is None:
+            return None
+        params = {"group": "hitting", "stats": "vsPlayer", "opposingPlayerId": pitcher_id}
+    else:
+        raise ValueError(f"stat_type must be one of {', '.join(STAT_TYPES)}")
+    return f"/api/v1/people/{player_id}/stats", params
+
+
+def cache_key(stat_type, player_id, date, params):
+    """(player id, stat type, date, detail) cache key for a stat request.
+
+    The date is bucketed so an expired entry keeps its key and can be
+    revalidated: last-7 ranges change daily, season lines and splits per
+    season, and batter-vs-pitcher is career.
+    """
+    bucket = date.isoformat() if stat_type == "last7" else "" if stat_type == "bvp" else str(date.year)
+    detail = params.get("sitCodes") or params.get("opposingPlayerId") or ""
+    return str(player_id), stat_type, bucket, str(detail)
+
+
+def parse_stat_line(payload):
+    """(avg, at bats) from a StatsAPI stats response; (None, 0) when empty."""
+    for group in payload.get("stats", []):
+        for split in group.get("splits", []):
+            stat = split.get("stat", {})
+            at_bats = int(stat.get("atBats") or 0)
+            avg = stat.get("avg")
+            if avg in (None, "", ".---", "-.--"):
+                return None, at_bats
+            return float(avg), at_bats
+    return None, 0
+
+
+async def lookup_player_id(client, name):
+    """MLB person id for a player name (first match), or StatsFetchError."""
+    payload = await client.get_json("/api/v1/people/search", {"names": name, "sportIds": 1},
+                                    cache_key=("", "search", "", name.strip().lower()))
+    people = payload.get("people") or []
+    if not people:
+        raise StatsFetchError(f"no player named {name!r}")
+    return people[0]["id"]
+
+
+async def _fetch_stat(client, stat_type, player_id, date, home, pitcher_hand, pitcher_id):
+    request = stat_request(stat_type, player_id, date, home, pitcher_hand, pitcher_id)
+    if request is None:
+        return None, 0
+    path, params = request
+    return parse_stat_line(await client.get_json(path, params, cache_key(stat_type, player_id, date, params)))
+
+
+async def fetch_player_stats(client, player_id, date=None, home=True, pitcher_hand="R", pitcher_id=None):
+    """Every stat line the model uses for one batter, fetched concurrently."""
+    date = date or datetime.date.today()
+    lines = await asyncio.gather(*(
+        _fetch_stat(client, stat_type, player_id, date, home, pitcher_hand, pitcher_id)
+        for stat_type in STAT_TYPES
+    ))
+    (season, _), (last7, _), (split, _), (hand, _), (bvp, bvp_ab) = lines
+    return {
+        "player_id": player_id,
+        "season_avg": season,
+        "last7_avg": last7,
+        "split_avg": split,
+        "hand_avg": hand,
+        "pitcher_avg": bvp,
+        "pitcher_ab": bvp_ab,
+    }
+
+
+async def fetch_slate_stats_async(players, client=None, date=None):
+    """Fetch stats for ``players`` (dicts with ``player_id`` or ``name``, and
+    optionally ``home``, ``pitcher_hand``, ``pitcher_id``) in input order.
+
+    A failed player yields ``{"error": ...}`` instead of failing the slate.
+    """
+    own_client = client is None
+    client = client or StatsClient()
+
+    async def one(player):
+        try:
+            player_id = player.get("player_id") or await lookup_player_id(client, player["name"])
+            stats = await fetch_player_stats(client, player_id, date, player.get("home", True),
+                                             player.get("pitcher_hand", "R"), player.get("pitcher_id"))
+        except StatsFetchError as e:
+            return {**player, "error": str(e)}
+        return {**player, **stats}
+
+    try:
+        return await asyncio.gather(*(one(player) for player in players))
+    finally:
+        if own_client:
+            await client.close()
+
+
+def resolve_cache(cache):
+    # None means the shared on-disk cache, False means no cache.
+    return default_cache() if cache is None else cache or None
+
+
+def fetch_slate_stats(players, base_url=None, date=None, cache=None, **client_options):
+    """Blocking wrapper around ``fetch_slate_stats_async`` for scripts and apps."""
+    async def run():
+        async with StatsClient(base_url, cache=resolve_cache(cache), **client_options) as client:
+            return await fetch_slate_stats_async(players, client, date)
+
+    return asyncio.run(run())
+
+
+def fetch_mlb_stats(player_name, home=True, pitcher_name=None, pitcher_hand="R", base_url=None, date=None,
+                    cache=None):
+    """Stats for one batter by name, for the apps' "Fetch Stats" button.
+
+    Raises StatsFetchError when the player is unknown or the API is down.
+    """
+    async def run():
+        async with StatsClient(base_url, cache=resolve_cache(cache)) as client:
+            names = [player_name] + ([pitcher_name] if pitcher_name else [])
+            ids = await asyncio.gather(*(lookup_player_id(client, n) for n in names))
+            return await fetch_player_stats(client, ids[0], date, home, pitcher_hand, ids[1] if pitcher_name else None)
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    from moneyball_stats_fixture import FixtureServer
+
+    async def bench(players, latency, **options):
+        async with FixtureServer(latency=latency) as fixture:
+            start = time.perf_counter()
+            async with StatsClient(fixture.url, **options) as client:
+                results = await fetch_slate_stats_async(players, client)
+            elapsed = time.perf_counter() - start
+        return elapsed, results, client
+
+    latency = 0.05
+    slate = [{"player_id": 600000 + i, "home": i % 2 == 0, "pitcher_hand": "RL"[i % 3 == 0],
+              "pitcher_id": 700000 + i // 9} for i in range(300)]
+    # One request at a time, as when each stat is fetched on its own.
+    serial_s, _, serial = asyncio.run(bench(slate[:10], latency, concurrency=1, rate=1e9, burst=1))
+    elapsed, results, client = asyncio.run(bench(slate, latency))
+    assert not any("error" in r for r in results)
+    print(f"fixture latency {latency * 1000:.0f} ms; one request at a time: "
+          f"{serial_s / 10 * len(slate):.1f} s for {len(slate)} players (extrapolated from 10)")
+    print(f"pooled client: {len(slate)} players, {client.requests} requests over "
+          f"{client.connections_opened} connections in {elapsed:.1f} s "
+          f"(rate limit {RATE:g}/s, concurrency {CONCURRENCY})")
@@ -0,0 +1,207 @@
+"""Local stand-in for the MLB StatsAPI endpoints the stats client uses.
+
+    python moneyball_stats_fixture.py --port 8766 --latency-ms 50
+    MONEYBALL_STATS_URL=http://127.0.0.1:8766 streamlit run moneyball_fetch_stats_app.py
+
+Serves ``/api/v1/people/search``, ``/api/v1/people/<id>/stats`` and
+``/api/v1/teams/<id>/roster`` (with the stats hydration) in the StatsAPI
+response shape, with numbers derived from the player id and query so they
+are stable between runs; a hydrated roster carries exactly the numbers
+the per-player endpoints return. ``latency`` delays every response
+and ``error_rate`` answers that share of requests with 503, to exercise
+the client's pooling and retries. With ``replay`` set to a directory of
+recorded responses (see ``moneyball_team_stats --record``) those are
+served verbatim instead, and unrecorded requests get 404. Responses carry an ETag and
+Last-Modified and conditional requests get 304, as on the real API, so
+cache revalidation can be tested. Keep-alive HTTP/1.1 over asyncio.
+"""
+import argparse
+import asyncio
+import collections
+import email.utils
+import hashlib
+import json
+import os
+import random
+import urllib.parse
+import zlib
+
+_REASONS = {200: "OK", 304: "Not Modified", 404: "Not Found", 405: "Method Not Allowed", 503: "Service Unavailable"}
+# Fixture data never changes, so every response was "last modified" here.
+LAST_MODIFIED = email.utils.formatdate(1735689600, usegmt=True)
+
+
+def _player_id(name):
+    return 100000 + zlib.crc32(name.strip().lower().encode()) % 900000
+
+
+def _stat_line(player_id, query):
+    rng = random.Random(f"{player_id}:{sorted(query.items())}")
+    at_bats = rng.randint(0, 30) if query.get("stats") == "vsPlayer" else rng.randint(20, 500)
+    hits = round(at_bats * rng.uniform(0.18, 0.34))
+    avg = f"{hits / at_bats:.3f}".lstrip("0") if at_bats else ".---"
+    return {"stats": [{"type": {"displayName": query.get("stats", "season")}, "group": {"displayName": "hitting"},
+                       "splits": [{"stat": {"atBats": at_bats, "hits": hits, "avg": avg}}]}]}
+
+
+# Roster shape: 13 position players and 13 pitchers per team.
+ROSTER_POSITIONS = ("C", "1B", "2B", "3B", "SS", "LF", "CF", "RF", "DH", "C", "IF", "OF", "UT") + ("P",) * 13
+
+
+def _hydrated_person(player_id, position, hydrate):
+    season = hydrate.get("season", "2025")
+    person = {"id": player_id, "fullName": f"Player {player_id}"}
+    if position == "P":
+        return person
+    # The same queries the per-player endpoint would get, so the numbers match.
+    base = {"group": "hitting", "season": season}
+    person["stats"] = [
+        {**_stat_line(player_id, {**base, "stats": "season"})["stats"][0], "type": {"displayName": "season"}},
+        {**_stat_line(player_id, {**base, "stats": "byDateRange", "startDate": hydrate.get("startDate", ""),
+                                  "endDate": hydrate.get("endDate", "")})["stats"][0],
+         "type": {"displayName": "byDateRange"}},
+        {"type": {"displayName": "statSplits"}, "group": {"displayName": "hitting"}, "splits": [
+            {"split": {"code": code},
+             "stat": _stat_line(player_id, {**base, "stats": "statSplits", "sitCodes": code})["stats"][0]["splits"][0]["stat"]}
+            for code in ("h", "a", "vl", "vr")
+        ]},
+    ]
+    return person
+
+
+def _roster(team_id, query):
+    # hydrate=person(stats(type=[...],season=2025,startDate=...,endDate=...)): pick out the key=value parts.
+    hydrate = dict(part.split("=", 1) for part in query.get("hydrate", "").replace("(", ",").replace(")", ",").split(",")
+                   if "=" in part and "[" not in part)
+    roster = []
+    for k, position in enumerate(ROSTER_POSITIONS):
+        player_id = 600000 + team_id * 100 + k
+        roster.append({"person": _hydrated_person(player_id, position, hydrate) if "hydrate" in query
+                       else {"id": player_id, "fullName": f"Player {player_id}"},
+                       "position": {"abbreviation": position}})
+    return {"roster": roster, "teamId": team_id}
+
+
+def recording_name(target):
+    """File name a recorded response for ``target`` (path and query) is stored under."""
+    return hashlib.sha1(target.encode()).hexdigest()[:16] + ".json"
+
+
+def respond(path, query):
+    """(status, payload) for one StatsAPI-style GET."""
+    parts = path.strip("/").split("/")
+    if parts[:3] == ["api", "v1", "teams"] and len(parts) == 5 and parts[4] == "roster" and parts[3].isdigit():
+        return 200, _roster(int(parts[3]), query)
+    if parts[:3] == ["api", "v1", "people"] and len(parts) == 4 and parts[3] == "search":
+        name = query.get("names", "")
+        return 200, {"people": [{"id": _player_id(name), "fullName": name}] if name else []}
+    if parts[:3] == ["api", "v1", "people"] and len(parts) == 5 and parts[4] == "stats" and parts[3].isdigit():
+        return 200, _stat_line(int(parts[3]), query)
+    return 404, {"message": f"no route {path}"}
+
+
+class FixtureServer:
+    """``async with FixtureServer() as server``; ``server.url`` is its base URL."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, seed=0, replay=None):
+        self.host = host
+        self.replay = replay
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._server = None
+        self._handlers = set()
+        self.requests = collections.Counter()
+        self.connections = 0
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        # Drop keep-alive connections so their handlers see EOF and finish.
+        for writer in list(self._handlers):
+            writer.close()
+        while self._handlers:
+            await asyncio.sleep(0.001)
+        await self._server.wait_closed()
+
+    def _recorded(self, target):
+        try:
+            with open(os.path.join(self.replay, recording_name(target)), "rb") as f:
+                return 200, f.read()
+        except FileNotFoundError:
+            return 404, json.dumps({"message": f"not recorded: {target}"}).encode()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self._handlers.add(writer)
+        try:
+            while (request_line := await reader.readline()).strip():
+                method, target, _ = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                url = urllib.parse.urlsplit(target)
+                query = dict(urllib.parse.parse_qsl(url.query))
+                self.requests[url.path] += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if method != "GET":
+                    status, body = 405, b'{"message": "use GET"}'
+                elif self._rng.random() < self.error_rate:
+                    status, body = 503, b'{"message": "injected failure"}'
+                elif self.replay:
+                    status, body = self._recorded(target)
+                else:
+                    status, payload = respond(url.path, query)
+                    body = json.dumps(payload).encode()
+                validators = ""
+                if status == 200:
+                    etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+                    validators = f"ETag: {etag}\r\nLast-Modified: {LAST_MODIFIED}\r\n"
+                    if headers.get("if-none-match") == etag or (
+                            "if-none-match" not in headers and headers.get("if-modified-since") == LAST_MODIFIED):
+                        status, body = 304, b""
+                        self.requests["304"] += 1
+                writer.write(f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n{validators}"
+                             f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._handlers.discard(writer)
+            writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve fake StatsAPI responses for offline runs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay before every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--replay", help="serve recorded responses from this directory instead")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        async with FixtureServer(args.host, args.port, args.latency_ms / 1000, args.error_rate,
+                                 replay=args.replay) as server:
+            print(f"fake StatsAPI on {server.url}")
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""Bulk stats hydration: one request per team instead of five per player.
+
+    python moneyball_team_stats.py -o team_stats.csv
+    python moneyball_batch_score.py lineup.csv --team-stats team_stats.csv -o board.csv
+
+``hydrate_teams`` asks StatsAPI for each team's active roster with the
+season line, last 7 days and home/away/vs-LHP/vs-RHP splits hydrated
+into every player (30 requests for the league, through the same pooled,
+cached and coalesced ``StatsClient`` as per-player fetches) and
+normalizes the responses into one typed per-player DataFrame:
+``player_id``, ``name``, ``team_id``, ``position`` and the
+``season_avg``, ``last7_avg``, ``home_avg``, ``away_avg``, ``vs_lhp_avg``
+and ``vs_rhp_avg`` columns (NaN when a player has no at-bats).
+
+``fill_slate`` fills a lineup's missing stat columns from that table
+(picking the home/away and hand split per row) for the batch scorer, and
+``prefill_stats`` fills the Player Stat Input form from it, falling back
+to per-player requests for players not on it.
+
+``--record DIR`` saves every raw response; ``moneyball_stats_fixture.py
+--replay DIR`` serves them back so runs can be repeated offline.
+``--benchmark`` compares per-player and per-team fetching (and a replay)
+against the local fixture.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import threading
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+from moneyball_stats_client import (
+    StatsClient,
+    StatsFetchError,
+    fetch_mlb_stats,
+    parse_stat_line,
+    resolve_cache,
+)
+
+# The 30 MLB club ids.
+TEAM_IDS = (108, 109, 110, 111, 112, 113, 114, 115, 116, 117, 118, 119, 120, 121, 133,
+            134, 135, 136, 137, 138, 139, 140, 141, 142, 143, 144, 145, 146, 147, 158)
+SPLIT_COLUMNS = {"h": "home_avg", "a": "away_avg", "vl": "vs_lhp_avg", "vr": "vs_rhp_avg"}
+STAT_COLUMNS = ["season_avg", "last7_avg", *SPLIT_COLUMNS.values()]
+COLUMNS = ["player_id", "name", "team_id", "position", *STAT_COLUMNS]
+
+
+def roster_request(team_id, date):
+    """(path, params) for one team's roster with every stat line hydrated."""
+    start = date - datetime.timedelta(days=7)
+    end = date - datetime.timedelta(days=1)
+    stats = (f"stats(group=[hitting],type=[season,byDateRange,statSplits],sitCodes=[{','.join(SPLIT_COLUMNS)}],"
+             f"season={date.year},startDate={start.isoformat()},endDate={end.isoformat()})")
+    return f"/api/v1/teams/{team_id}/roster", {"rosterType": "active", "hydrate": f"person({stats})"}
+
+
+def normalize_roster(payload, team_id):
+    """Per-player rows (dicts of COLUMNS) from a hydrated roster response; pitchers are skipped."""
+    rows = []
+    for entry in payload.get("roster", []):
+        position = entry.get("position", {}).get("abbreviation", "")
+        if position == "P":
+            continue
+        person = entry.get("person", {})
+        row = dict.fromkeys(STAT_COLUMNS, np.nan)
+        row.update(player_id=person["id"], name=person.get("fullName", ""), team_id=team_id, position=position)
+        for group in person.get("stats", []):
+            kind = group.get("type", {}).get("displayName")
+            if kind == "statSplits":
+                for split in group.get("splits", []):
+                    column = SPLIT_COLUMNS.get(split.get("split", {}).get("code"))
+                    if column:
+                        avg, _ = parse_stat_line({"stats": [{"splits": [split]}]})
+                        row[column] = np.nan if avg is None else avg
+            elif kind in ("season", "byDateRange"):
+                avg, _ = parse_stat_line({"stats": [group]})
+                row["season_avg" if kind == "season" else "last7_avg"] = np.nan if avg is None else avg
+        rows.append(row)
+    return rows
+
+
+def _frame(rows):
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    return df.astype({"player_id": "int64", "name": "string", "team_id": "int64", "position": "string",
+                      **dict.fromkeys(STAT_COLUMNS, "float64")})
+
+
+async def hydrate_teams_async(client, team_ids=TEAM_IDS, date=None, record=None):
+    """Fetch and normalize every team's roster; returns (table, {team_id: error})."""
+    date = date or datetime.date.today()
+
+    async def one(team_id):
+        path, params = roster_request(team_id, date)
+        payload = await client.get_json(path, params, cache_key=(str(team_id), "roster", date.isoformat(), ""))
+        if record:
+            target = f"{path}?{urllib.parse.urlencode(params)}"
+            with open(os.path.join(record, recording_name(target)), "w") as f:
+                json.dump(payload, f)
+        return normalize_roster(payload, team_id)
+
+    if record:
+        from moneyball_stats_fixture import recording_name
+
+        os.makedirs(record, exist_ok=True)
+    results = await asyncio.gather(*(one(team_id) for team_id in team_ids), return_exceptions=True)
+    rows, errors = [], {}
+    for team_id, result in zip(team_ids, results):
+        if isinstance(result, StatsFetchError):
+            errors[team_id] = str(result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            rows.extend(result)
+    return _frame(rows), errors
+
+
+def hydrate_teams(team_ids=TEAM_IDS, date=None, base_url=None, cache=None, record=None, **client_options):
+    """Blocking wrapper around ``hydrate_teams_async``."""
+    async def run():
+        async with StatsClient(base_url, cache=resolve_cache(cache), **client_options) as client:
+            return await hydrate_teams_async(client, team_ids, date, record)
+
+    return asyncio.run(run())
+
+
+_tables = {}  # (date, base_url) -> table with every team
+_tables_lock = threading.Lock()
+
+
+def team_table(date=None, base_url=None):
+    """Today's league-wide table, hydrated once per process (and day) on first use.
+
+    Raises StatsFetchError if any team failed, so a partial table is not kept.
+    """
+    key = (date or datetime.date.today(), base_url)
+    with _tables_lock:
+        if key not in _tables:
+            table, errors = hydrate_teams(date=key[0], base_url=base_url)
+            if errors:
+                raise StatsFetchError("; ".join(errors.values()))
+            _tables.clear()
+            _tables[key] = table
+        return _tables[key]
+
+
+def _pick(home, vs_lhp, table):
+    home = np.asarray(home, dtype=bool)
+    vs_lhp = np.asarray(vs_lhp, dtype=bool)
+    split = np.where(home, table["home_avg"].to_numpy(), table["away_avg"].to_numpy())
+    hand = np.where(vs_lhp, table["vs_lhp_avg"].to_numpy(), table["vs_rhp_avg"].to_numpy())
+    return split, hand
+
+
+def player_defaults(name, home=True, pitcher_hand="R", table=None):
+    """Season/last-7/split/hand averages for ``name`` from the team table, or None if not found."""
+    table = team_table() if table is None else table
+    match = table[table["name"].str.lower() == name.strip().lower()]
+    if match.empty:
+        return None
+    row = match.iloc[[0]]
+    split, hand = _pick(home, pitcher_hand == "L", row)
+    stats = {"season_avg": row["season_avg"].iloc[0], "last7_avg": row["last7_avg"].iloc[0],
+             "split_avg": split[0], "hand_avg": hand[0]}
+    return {"player_id": int(row["player_id"].iloc[0]),
+            **{k: None if np.isnan(v) else float(v) for k, v in stats.items()}}
+
+
+def prefill_stats(name, home=True, pitcher_name=None, pitcher_hand="R"):
+    """Stats for the Player Stat Input form.
+
+    Taken from today's team table when the player is on it (no per-player
+    requests); a per-player ``fetch_mlb_stats`` otherwise, or when a
+    pitcher is given and batter-vs-pitcher is needed.
+    """
+    if not pitcher_name:
+        try:
+            stats = player_defaults(name, home, pitcher_hand)
+        except StatsFetchError:
+            stats = None  # hydration failed; the per-player calls may still work
+        if stats is not None:
+            return {**stats, "pitcher_avg": None, "pitcher_ab": 0}
+    return fetch_mlb_stats(name, home, pitcher_name, pitcher_hand)
+
+
+def fill_slate(lineup, table):
+    """Fill missing ``season_avg``/``last7_avg``/``split_avg``/``hand_avg`` in ``lineup``.
+
+    Rows are matched on ``player_id`` when the lineup has it, else on
+    name (case-insensitive). ``home`` (default True) and ``pitcher_hand``
+    (L/R) columns pick the split per row; where ``pitcher_hand`` is missing
+    the slate's own ``handedness`` (RHP/LHP) is used, then right-handed.
+    Values already in the lineup are kept.
+    """
+    lineup = lineup.copy()
+    if "player_id" in lineup.columns:
+        stats = table.drop_duplicates("player_id").set_index("player_id").reindex(lineup["player_id"])
+    else:
+        names = table.assign(key=table["name"].str.lower()).drop_duplicates("key").set_index("key")
+        stats = names.reindex(lineup["name"].astype("string").str.strip().str.lower())
+    home = lineup["home"].fillna(True).to_numpy() if "home" in lineup.columns else True
+    hand = pd.Series(pd.NA, index=lineup.index, dtype="string")
+    for column in ("pitcher_hand", "handedness"):
+        if column in lineup.columns:
+            initial = lineup[column].astype("string").str.strip().str.upper().str[:1]
+            hand = hand.fillna(initial.mask(initial == ""))
+    vs_lhp = (hand == "L").fillna(False).to_numpy()
+    split, hand = _pick(home, vs_lhp, stats)
+    derived = {"season_avg": stats["season_avg"].to_numpy(), "last7_avg": stats["last7_avg"].to_numpy(),
+               "split_avg": split, "hand_avg": hand}
+    for column, values in derived.items():
+        values = pd.Series(values, index=lineup.index)
+        lineup[column] = lineup[column].fillna(values) if column in lineup.columns else values
+    return lineup
+
+
+def _check_fill_slate():
+    from moneyball_lineup_import import validate_slate
+
+    table = pd.DataFrame({"player_id": [1, 2, 3], "name": ["A", "B", "C"], "season_avg": 0.250,
+                          "last7_avg": 0.300, "home_avg": 0.260, "away_avg": 0.240,
+                          "vs_lhp_avg": 0.400, "vs_rhp_avg": 0.200})
+    lineup = pd.DataFrame({"name": ["A", "B", "C"], "batting_order": [1, 2, 3], "odds": -150,
+                           "handedness": ["LHP", "RHP", None], "pitcher_hand": [None, None, "L"]})
+    filled = validate_slate(fill_slate(lineup, table))
+    assert filled["hand_avg"].tolist() == [0.400, 0.200, 0.400], filled["hand_avg"].tolist()
+
+
+def _benchmark():
+    import tempfile
+    import time
+
+    from moneyball_stats_client import fetch_slate_stats_async
+    from moneyball_stats_fixture import FixtureServer
+
+    _check_fill_slate()
+    date = datetime.date(2025, 6, 15)
+
+    async def bulk(replay=None, record=None):
+        async with FixtureServer(latency=0.05, replay=replay) as fixture:
+            async with StatsClient(fixture.url) as client:
+                start = time.perf_counter()
+                table, errors = await hydrate_teams_async(client, TEAM_IDS, date, record)
+            assert not errors, errors
+            return table, time.perf_counter() - start, client.requests
+
+    async def per_player(table):
+        async with FixtureServer(latency=0.05) as fixture:
+            async with StatsClient(fixture.url) as client:
+                start = time.perf_counter()
+                stats = await fetch_slate_stats_async([{"player_id": pid} for pid in table["player_id"]], client, date)
+            return stats, time.perf_counter() - start, client.requests
+
+    with tempfile.TemporaryDirectory() as tmp:
+        table, bulk_s, bulk_requests = asyncio.run(bulk(record=tmp))
+        replayed, replay_s, _ = asyncio.run(bulk(replay=tmp))
+        assert replayed.equals(table)
+    stats, player_s, player_requests = asyncio.run(per_player(table))
+    assert np.allclose(table["season_avg"], [p["season_avg"] for p in stats], equal_nan=True)
+    assert np.allclose(table["home_avg"], [p["split_avg"] for p in stats], equal_nan=True)
+    print(f"{len(table)} hitters from {len(TEAM_IDS)} teams, fixture latency 50 ms")
+    print(f"per player: {player_requests} requests in {player_s:.1f} s")
+    print(f"per team:   {bulk_requests} requests in {bulk_s:.2f} s (replayed from the recording: {replay_s:.2f} s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hydrate every team's roster stats into one per-player table.")
+    parser.add_argument("-o", "--output", default="team_stats.csv", help=".csv or .parquet")
+    parser.add_argument("--date", type=datetime.date.fromisoformat, help="as-of date (default today)")
+    parser.add_argument("--teams", type=int, nargs="+", default=TEAM_IDS, help="team ids (default all 30)")
+    parser.add_argument("--base-url", help="stats API (default MONEYBALL_STATS_URL or statsapi.mlb.com)")
+    parser.add_argument("--record", help="also save every raw response in this directory")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the on-disk stats cache")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare per-player and per-team fetching against a local fixture, then exit")
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        return _benchmark()
+    table, errors = hydrate_teams(args.teams, args.date, args.base_url, False if args.no_cache else None, args.record)
+    for team_id, error in errors.items():
+        print(f"team {team_id}: {error}")
+    if args.output.endswith(".parquet"):
+        table.to_parquet(args.output, index=False)
+    else:
+        table.to_csv(args.output, index=False)
+    print(f"{len(table)} players from {len(args.teams) - len(errors)} teams -> {args.output}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,8 +3,10 @@ import streamlit as st
 import pandas as pd
 from scipy.stats import binom
 
+from moneyball_assets import image_variant
+
 # ✅ Show logo from local file
-st.image("mbp_logo.png", width=300)
+st.image(image_variant("mbp_logo.png", 300), width=300)
 
 # Page config and title
 st.set_page_config(page_title="Moneyball Phil: Hit Simulator", layout="wide")
@@ -2,10 +2,12 @@
 import streamlit as st
 import pandas as pd
 
+from moneyball_assets import image_variant
+
 st.set_page_config(page_title="Moneyball Phil", layout="centered")
 
 # Load smaller logo
-st.image("logo.png", width=120)
+st.image(image_variant("logo.png", 120), width=120)
 
 st.title("💥 Moneyball Phil: Daily Hit Probability Simulator")
 
@@ -3,11 +3,13 @@ import streamlit as st
 import pandas as pd
 from scipy.stats import binom
 
+from moneyball_assets import image_variant
+
 # Set up the dashboard
 st.set_page_config(page_title="Moneyball Phil: Hit Simulator", layout="wide")
 
 # Display logo from local file in the same repo
-st.image("moneyball_logo.png", width=300)
+st.image(image_variant("moneyball_logo.png", 300), width=300)
 
 st.title("⚾ Moneyball Phil: Daily Hit Probability Simulator")
 
@@ -3,11 +3,13 @@ import streamlit as st
 import pandas as pd
 from scipy.stats import binom
 
+from moneyball_assets import image_variant
+
 # Set Streamlit page configuration
 st.set_page_config(page_title="Moneyball Phil: Hit Simulator", layout="wide")
 
 # Display logo from local file
-st.image("moneyball_logo.png", width=300)
+st.image(image_variant("moneyball_logo.png", 300), width=300)
 
 # App title
 st.title("⚾ Moneyball Phil: Daily Hit Probability Simulator")